@@ -0,0 +1,105 @@
+import base64
+import io
+import json
+import random
+import timeit
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from recipes.models import Recipe
+from recipes.serializers import RecipeListSerializer
+from utils.parsers import ORJSONParser
+from utils.renderers import ORJSONRenderer
+
+BENCH_IMAGE_SIZE = (1280, 960)
+
+# (name, renderer, parser)
+BACKENDS = (
+    ('json', JSONRenderer(), JSONParser()),
+    ('orjson', ORJSONRenderer(), ORJSONParser()),
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает стандартные JSON-рендерер и парсер DRF с orjson '
+            'на ответах и запросах Foodgram из текущей базы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100)
+        parser.add_argument('--rounds', type=int, default=50)
+
+    def handle(self, *args, **options):
+        recipes = list(
+            Recipe.objects.for_listing(AnonymousUser())[:options['limit']])
+        if not recipes:
+            raise CommandError(
+                'В базе нет рецептов: загрузите данные перед запуском.')
+        payloads = (
+            ('recipes-list', self.list_payload(recipes)),
+            ('recipe-detail', self.list_payload(recipes[:1])['results'][0]),
+            ('recipe-create', self.create_payload(recipes[0])),
+        )
+        for name, data in payloads:
+            self.compare(name, data, options['rounds'])
+
+    def list_payload(self, recipes):
+        return {
+            'count': len(recipes),
+            'next': None,
+            'previous': None,
+            'results': RecipeListSerializer(
+                recipes, many=True, context={'request': None}).data,
+        }
+
+    def create_payload(self, recipe):
+        try:
+            with recipe.image.open('rb') as file:
+                image = file.read()
+        except (OSError, ValueError):
+            buffer = io.BytesIO()
+            width, height = BENCH_IMAGE_SIZE
+            Image.frombytes(
+                'RGB', BENCH_IMAGE_SIZE, random.randbytes(width * height * 3),
+            ).save(buffer, 'JPEG')
+            image = buffer.getvalue()
+        return {
+            'name': recipe.name,
+            'text': recipe.text,
+            'cooking_time': recipe.cooking_time,
+            'image': ('data:image/jpeg;base64,'
+                      + base64.b64encode(image).decode()),
+            'ingredients': [
+                {'id': item.ingredient_id, 'amount': item.amount}
+                for item in recipe.recipe_ingredients.all()
+            ],
+        }
+
+    def compare(self, name, data, rounds):
+        results = {}
+        for backend, renderer, parser in BACKENDS:
+            content = renderer.render(data)
+            render_time = timeit.timeit(
+                lambda: renderer.render(data), number=rounds) / rounds
+            parse_time = timeit.timeit(
+                lambda: parser.parse(io.BytesIO(content)),
+                number=rounds) / rounds
+            results[backend] = (content, render_time, parse_time)
+
+        contents = [content for content, _, _ in results.values()]
+        if len({json.dumps(json.loads(content), sort_keys=True)
+                for content in contents}) != 1:
+            raise CommandError(f'{name}: результаты рендереров различаются.')
+
+        base = results[BACKENDS[0][0]]
+        for backend, (content, render_time, parse_time) in results.items():
+            self.stdout.write(
+                f'{name:<14} {backend:<7} {len(content) / 1024:>9.1f} КиБ '
+                f'рендер {render_time * 1000:>8.2f} мс '
+                f'(x{base[1] / render_time:>4.1f}) '
+                f'парсинг {parse_time * 1000:>8.2f} мс '
+                f'(x{base[2] / parse_time:>4.1f})'
+            )
@@ -0,0 +1,67 @@
+import timeit
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from recipes.models import Recipe
+from recipes.serializers import RecipeListSerializer, RecipeReadSerializer
+from users.models import Sub, User
+from users.serializers import UserReadSerializer, UserSerializer
+
+
+class Command(BaseCommand):
+    help = ('Сверяет вывод облегченных сериализаторов чтения с '
+            'ModelSerializer и сравнивает время сериализации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100)
+        parser.add_argument('--rounds', type=int, default=20)
+
+    def handle(self, *args, **options):
+        limit, rounds = options['limit'], options['rounds']
+        subscriber = Sub.objects.values_list('sub_from', flat=True).first()
+        viewers = [AnonymousUser()]
+        if subscriber is not None:
+            viewers.append(User.objects.get(pk=subscriber))
+
+        for viewer in viewers:
+            request = Request(APIRequestFactory().get('/api/recipes/'))
+            request.user = viewer
+            recipes = list(Recipe.objects.for_listing(viewer)[:limit])
+            users = list(User.objects.with_is_subscribed(viewer)[:limit])
+            if not recipes:
+                raise CommandError(
+                    'В базе нет рецептов: загрузите данные перед запуском.')
+            self.compare(f'recipes ({viewer})', recipes, RecipeListSerializer,
+                         RecipeReadSerializer, request, rounds)
+            self.compare(f'users ({viewer})', users, UserSerializer,
+                         UserReadSerializer, request, rounds)
+
+    def compare(self, name, objects, model_serializer, read_serializer,
+                request, rounds):
+        context = {'request': request}
+        expected = model_serializer(objects, many=True, context=context).data
+        actual = read_serializer(objects, many=True, context=context).data
+        for before, after in zip(expected, actual):
+            if dict(before) != after or list(before) != list(after):
+                raise CommandError(
+                    f'{name}: вывод {read_serializer.__name__} '
+                    f'расходится с {model_serializer.__name__} '
+                    f'для объекта {before.get("id")}.'
+                )
+
+        timings = [
+            timeit.timeit(
+                lambda: serializer(objects, many=True, context=context).data,
+                number=rounds,
+            ) / rounds / len(objects)
+            for serializer in (model_serializer, read_serializer)
+        ]
+        self.stdout.write(
+            f'{name:<28} {len(objects):>4} объектов '
+            f'{model_serializer.__name__} {timings[0] * 1e6:>7.1f} мкс, '
+            f'{read_serializer.__name__} {timings[1] * 1e6:>7.1f} мкс '
+            f'(x{timings[0] / timings[1]:.1f})'
+        )
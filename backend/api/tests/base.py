@@ -0,0 +1,131 @@
+import base64
+import io
+import random
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, ShortLink)
+from recipes.response_cache import invalidate_recipe_responses
+from users.models import Sub, User
+
+BATCH_SIZE = 2000
+INGREDIENTS_PER_RECIPE = 6
+BENCH_SUBSCRIPTIONS = 20
+BENCH_CART_SIZE = 50
+BENCH_BULK_SIZE = 30
+BENCH_IMAGE = 'recipes/benchmark.png'
+BENCH_PASSWORD = 'benchmark-password'
+BENCH_INGREDIENTS = settings.BASE_DIR.parent / 'data' / 'ingredients.csv'
+
+BASE64_IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABAgMAAABieywaAAAA'
+    'CVBMVEUAAAD///9fX1/S0ecCAAAACXBIWXMAAA7EAAAOxAGVKw4bAAAACklEQVQImWNo'
+    'AAAAggCByxOyYQAAAABJRU5ErkJggg=='
+)
+
+
+def seed_dataset(users, recipes, seed=0):
+    random.seed(seed)
+    # Imported recipes copy the seeded image, so the file has to exist
+    # in storage.
+    storage = Recipe._meta.get_field('image').storage
+    if not storage.exists(BENCH_IMAGE):
+        storage.save(BENCH_IMAGE, ContentFile(
+            base64.b64decode(BASE64_IMAGE.partition(',')[2])))
+    call_command('load_ingredients', path=BENCH_INGREDIENTS,
+                 stdout=io.StringIO())
+    ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+
+    password = make_password(BENCH_PASSWORD)
+    User.objects.bulk_create(
+        (User(email=f'bench{i}@foodgram.local', username=f'bench{i}',
+              first_name='Бенч', last_name=str(i), password=password)
+         for i in range(users)),
+        batch_size=BATCH_SIZE,
+    )
+    user_ids = list(User.objects.filter(
+        username__startswith='bench').values_list('id', flat=True))
+
+    Recipe.objects.bulk_create(
+        (Recipe(author_id=user_ids[i % len(user_ids)],
+                name=f'Бенчмарк-рецепт {i}', text='Описание рецепта',
+                cooking_time=random.randint(1, 120), image=BENCH_IMAGE)
+         for i in range(recipes)),
+        batch_size=BATCH_SIZE,
+    )
+    recipes = Recipe.objects.filter(name__startswith='Бенчмарк-рецепт')
+    recipes.update_search_vector()
+    recipe_ids = list(recipes.values_list('id', flat=True))
+
+    RecipeIngredient.objects.bulk_create(
+        (RecipeIngredient(recipe_id=recipe_id, ingredient_id=ingredient,
+                          amount=random.randint(1, 500))
+         for recipe_id in recipe_ids
+         for ingredient in random.sample(ingredient_ids,
+                                         INGREDIENTS_PER_RECIPE)),
+        batch_size=BATCH_SIZE,
+    )
+
+    bench_user = User.objects.get(id=user_ids[0])
+    authors = user_ids[1:BENCH_SUBSCRIPTIONS + 1]
+    Sub.objects.bulk_create(
+        Sub(sub_from=bench_user, sub_to_id=author) for author in authors
+    )
+    cart = random.sample(recipe_ids, BENCH_CART_SIZE)
+    ShoppingCart.objects.bulk_create(
+        ShoppingCart(user=bench_user, recipe_id=recipe) for recipe in cart
+    )
+    Favorite.objects.bulk_create(
+        Favorite(user=bench_user, recipe_id=recipe) for recipe in cart
+    )
+    call_command('reconcile_counters', stdout=io.StringIO())
+    own_recipe = Recipe.objects.filter(author=bench_user).first()
+    recipe = Recipe.objects.exclude(
+        author=bench_user).exclude(id__in=cart).first()
+    link = ShortLink.objects.create(recipe_to_link=recipe)
+    token = Token.objects.create(user=bench_user)
+    # bulk_create sends no signals.
+    invalidate_recipe_responses()
+
+    return {
+        'user': bench_user,
+        'token': token.key,
+        'email': bench_user.email,
+        'author': authors[0],
+        'stranger': user_ids[-1],
+        'recipe': recipe.id,
+        'own_recipe': own_recipe.id,
+        'link': link.link_code,
+        'ingredient': ingredient_ids[0],
+        'ingredients': random.sample(ingredient_ids, 3),
+        'bulk_recipes': random.sample(recipe_ids, BENCH_BULK_SIZE),
+        'bulk_users': random.sample(user_ids[1:], BENCH_BULK_SIZE),
+    }
+
+
+class SeededTestCase(TestCase):
+    # Files go to a temporary media directory and cached responses,
+    # tokens and the ingredient index to a cache of this test only.
+    @classmethod
+    def setUpClass(cls):
+        media_root = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(
+            MEDIA_ROOT=media_root,
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': cls.__qualname__,
+            }},
+        ))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.context = seed_dataset(
+            settings.BENCHMARK_USERS, settings.BENCHMARK_RECIPES)
@@ -0,0 +1,174 @@
+import sys
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from recipes.transfer import export_recipes
+from utils.authentication import (CachedTokenAuthentication,
+                                  invalidate_cached_user, )
+from utils.renderers import NDJSONRenderer
+from .base import BASE64_IMAGE, BENCH_PASSWORD, SeededTestCase
+
+# (name, client, method, url, payload, expected status, query budget)
+# client is 'anon' or 'auth'; url and payload are formatted with the
+# ids of the seeded benchmark objects.
+ENDPOINTS = (
+    ('users-list', 'anon', 'get', '/api/users/?limit=100', None, 200, 3),
+    ('users-list-auth', 'auth', 'get', '/api/users/?limit=100', None,
+     200, 2),
+    ('users-detail', 'auth', 'get', '/api/users/{author}/', None, 200, 1),
+    ('users-me', 'auth', 'get', '/api/users/me/', None, 200, 1),
+    ('users-create', 'anon', 'post', '/api/users/',
+     {'email': 'benchnew@foodgram.local', 'username': 'benchnew',
+      'first_name': 'Бенч', 'last_name': 'Новый',
+      'password': BENCH_PASSWORD}, 201, 3),
+    ('users-subscriptions', 'auth', 'get',
+     '/api/users/subscriptions/?limit=6&recipes_limit=3', None, 200, 3),
+    ('users-feed', 'auth', 'get', '/api/users/feed/?limit=100', None,
+     200, 3),
+    ('users-subscribe', 'auth', 'post', '/api/users/{stranger}/subscribe/',
+     None, 201, 3),
+    ('users-unsubscribe', 'auth', 'delete',
+     '/api/users/{stranger}/subscribe/', None, 204, 1),
+    ('users-subscribe-bulk', 'auth', 'post', '/api/users/subscribe/bulk/',
+     {'ids': 'bulk_users'}, 200, 2),
+    ('users-unsubscribe-bulk', 'auth', 'delete',
+     '/api/users/subscribe/bulk/', {'ids': 'bulk_users'}, 200, 1),
+    ('users-avatar-put', 'auth', 'put', '/api/users/me/avatar/',
+     {'avatar': None}, 200, 1),
+    ('users-avatar-delete', 'auth', 'delete', '/api/users/me/avatar/',
+     None, 204, 2),
+    ('users-set-password', 'auth', 'post', '/api/users/set_password/',
+     {'current_password': BENCH_PASSWORD,
+      'new_password': BENCH_PASSWORD + '-2'}, 204, 1),
+    ('recipes-list', 'anon', 'get', '/api/recipes/?limit=100', None, 200, 6),
+    ('recipes-list-auth', 'auth', 'get', '/api/recipes/?limit=100', None,
+     200, 6),
+    ('recipes-list-cursor', 'auth', 'get',
+     '/api/recipes/?pagination=cursor&limit=100', None, 200, 5),
+    ('recipes-list-author', 'auth', 'get',
+     '/api/recipes/?author={author}&limit=100', None, 200, 7),
+    ('recipes-list-favorited', 'auth', 'get',
+     '/api/recipes/?is_favorited=1&limit=100', None, 200, 6),
+    ('recipes-list-in-cart', 'auth', 'get',
+     '/api/recipes/?is_in_shopping_cart=1&limit=100', None, 200, 6),
+    ('recipes-search', 'anon', 'get',
+     '/api/recipes/?search=рецепт 42&limit=100', None, 200, 6),
+    ('recipes-detail', 'auth', 'get', '/api/recipes/{recipe}/', None,
+     200, 5),
+    ('recipes-get-link', 'auth', 'get', '/api/recipes/{recipe}/get-link/',
+     None, 200, 4),
+    ('short-link', 'anon', 'get', '/s/{link}/', None, 302, 2),
+    ('recipes-create', 'auth', 'post', '/api/recipes/',
+     {'name': 'Бенчмарк', 'text': 'Бенчмарк', 'cooking_time': 10,
+      'image': None, 'ingredients': None}, 201, 9),
+    ('recipes-update', 'auth', 'patch', '/api/recipes/{own_recipe}/',
+     {'name': 'Бенчмарк-правка', 'cooking_time': 15, 'ingredients': None},
+     200, 15),
+    ('recipes-favorite', 'auth', 'post', '/api/recipes/{recipe}/favorite/',
+     None, 201, 3),
+    ('recipes-unfavorite', 'auth', 'delete',
+     '/api/recipes/{recipe}/favorite/', None, 204, 2),
+    ('recipes-cart-add', 'auth', 'post',
+     '/api/recipes/{own_recipe}/shopping_cart/', None, 201, 5),
+    ('recipes-cart-remove', 'auth', 'delete',
+     '/api/recipes/{own_recipe}/shopping_cart/', None, 204, 5),
+    ('recipes-favorite-bulk', 'auth', 'post', '/api/recipes/favorite/bulk/',
+     {'ids': 'bulk_recipes'}, 200, 3),
+    ('recipes-unfavorite-bulk', 'auth', 'delete',
+     '/api/recipes/favorite/bulk/', {'ids': 'bulk_recipes'}, 200, 2),
+    ('recipes-cart-add-bulk', 'auth', 'post',
+     '/api/recipes/shopping_cart/bulk/', {'ids': 'bulk_recipes'}, 200, 5),
+    ('recipes-cart-remove-bulk', 'auth', 'delete',
+     '/api/recipes/shopping_cart/bulk/', {'ids': 'bulk_recipes'}, 200, 5),
+    ('recipes-download-cart', 'auth', 'get',
+     '/api/recipes/download_shopping_cart/', None, 200, 2),
+    ('recipes-export', 'auth', 'get', '/api/recipes/export/', None, 200, 3),
+    ('recipes-import', 'auth', 'post', '/api/recipes/import/',
+     {'ndjson': 'bulk_recipes'}, 200, 8),
+    ('recipes-delete', 'auth', 'delete', '/api/recipes/{own_recipe}/',
+     None, 204, 10),
+    ('ingredients-list', 'anon', 'get', '/api/ingredients/', None, 200, 2),
+    ('ingredients-search', 'anon', 'get', '/api/ingredients/?name=мо',
+     None, 200, 0),
+    ('ingredients-detail', 'anon', 'get', '/api/ingredients/{ingredient}/',
+     None, 200, 2),
+    ('token-login', 'anon', 'post', '/api/auth/token/login/',
+     {'email': '{email}', 'password': BENCH_PASSWORD + '-2'}, 200, 3),
+    ('token-logout', 'auth', 'post', '/api/auth/token/logout/', None,
+     204, 2),
+)
+
+
+class EndpointBudgetTests(SeededTestCase):
+    def test_query_budgets(self):
+        clients = {
+            'anon': APIClient(HTTP_HOST='localhost'),
+            'auth': APIClient(HTTP_HOST='localhost'),
+        }
+        clients['auth'].credentials(
+            HTTP_AUTHORIZATION=f'Token {self.context["token"]}')
+        authentication = CachedTokenAuthentication()
+
+        for name, client, method, url, payload, expected, budget in (
+                ENDPOINTS):
+            url = url.format(**self.context)
+            options = {'format': 'json'}
+            if payload is not None:
+                payload = self.build_payload(payload)
+            if isinstance(payload, bytes):
+                options = {'content_type': NDJSONRenderer.media_type}
+
+            if client == 'auth':
+                authentication.authenticate_credentials(
+                    self.context['token'])
+            tracemalloc.start()
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(clients[client], method)(
+                    url, data=payload, **options)
+                if getattr(response, 'streaming', False):
+                    for _ in response.streaming_content:
+                        pass
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if method != 'get':
+                # The test transaction is never committed, so the cached
+                # token user is dropped by hand instead of on commit.
+                invalidate_cached_user(self.context['user'].pk)
+
+            sys.stdout.write(
+                f'\n{name:<24} {method.upper():<6} '
+                f'{response.status_code:>3}/{expected:<3} '
+                f'{len(queries):>3}/{budget:<3} запросов '
+                f'{elapsed * 1000:>8.1f} мс {peak / 1024:>9.1f} КиБ'
+            )
+            with self.subTest(name):
+                self.assertEqual(response.status_code, expected)
+                self.assertLessEqual(len(queries), budget)
+
+    def build_payload(self, payload):
+        if 'ndjson' in payload:
+            return b''.join(export_recipes(Recipe.objects.filter(
+                pk__in=self.context[payload['ndjson']])))
+        payload = {
+            key: value.format(**self.context)
+            if isinstance(value, str) else value
+            for key, value in payload.items()
+        }
+        for field in ('image', 'avatar'):
+            if field in payload:
+                payload[field] = BASE64_IMAGE
+        if 'ids' in payload:
+            payload['ids'] = self.context[payload['ids']]
+        if 'ingredients' in payload:
+            payload['ingredients'] = [
+                {'id': ingredient, 'amount': 10}
+                for ingredient in self.context['ingredients']
+            ]
+        return payload
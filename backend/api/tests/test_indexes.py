@@ -0,0 +1,91 @@
+import random
+import re
+from unittest import skipUnless
+
+from django.db import connection
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Sub, User
+from .base import BATCH_SIZE, SeededTestCase
+
+LINKS_PER_USER = 10
+SORT_STEP = re.compile(r'\bSort\b')
+
+
+@skipUnless(connection.vendor == 'postgresql',
+            'Проверка планов поддерживается только в PostgreSQL.')
+class IndexPlanTests(SeededTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        user_ids = list(User.objects.values_list('id', flat=True))
+        recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+        for model in (Favorite, ShoppingCart):
+            model.objects.bulk_create(
+                (model(user_id=user, recipe_id=recipe)
+                 for user in user_ids
+                 for recipe in random.sample(recipe_ids, LINKS_PER_USER)),
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+        Sub.objects.bulk_create(
+            (Sub(sub_from_id=user, sub_to_id=author)
+             for user in user_ids
+             for author in random.sample(user_ids, LINKS_PER_USER)
+             if author != user),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        cls.context['favorited'] = Favorite.objects.filter(
+            user=cls.context['user']).values_list('recipe', flat=True).first()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def checks(self):
+        user, author = self.context['user'], self.context['author']
+        recipe = self.context['favorited']
+        # (name, queryset, any of the expected indexes, ORDER BY may sort)
+        yield ('recipes-by-author',
+               Recipe.objects.filter(author=author).order_by(
+                   '-pub_date', '-id')[:10],
+               ('recipe_author_pub_date_idx',), False)
+        yield ('recipes-latest',
+               Recipe.objects.order_by('-pub_date', '-id')[:10],
+               ('recipe_pub_date_id_idx',), False)
+        for model in (Favorite, ShoppingCart):
+            name = model._meta.model_name
+            by_user = f'unique_user_recipe_{name}'
+            by_recipe = f'{name}_recipe_user_idx'
+            yield (f'{name}-by-user',
+                   model.objects.filter(user=user).values('recipe'),
+                   (by_user,), False)
+            yield (f'{name}-exists',
+                   model.objects.filter(user=user, recipe=recipe).values(
+                       'pk'),
+                   (by_user, by_recipe), False)
+            yield (f'{name}-by-recipe',
+                   model.objects.filter(recipe=recipe).values('user'),
+                   (by_recipe,), False)
+        yield ('recipes-favorited',
+               Recipe.objects.filter(favorite__user=user)[:10],
+               ('unique_user_recipe_favorite',), True)
+        yield ('recipes-in-cart',
+               Recipe.objects.filter(shopping_cart__user=user)[:10],
+               ('unique_user_recipe_shoppingcart',), True)
+        yield ('subscriptions',
+               Sub.objects.filter(sub_from=user).values('sub_to'),
+               ('unique_subscription',), False)
+        yield ('subscribers',
+               Sub.objects.filter(sub_to=author).values('sub_from'),
+               ('sub_to_from_idx',), False)
+
+    def test_query_plans(self):
+        for name, queryset, indexes, sorted_ok in self.checks():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertTrue(
+                    any(index in plan for index in indexes),
+                    f'Нет индекса {" | ".join(indexes)}:\n{plan}')
+                if not sorted_ok:
+                    self.assertIsNone(
+                        SORT_STEP.search(plan), f'Лишняя сортировка:\n{plan}')
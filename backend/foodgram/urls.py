@@ -1,11 +1,16 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
 from recipes.views import ShortLinkNavigate
+from utils.profiling import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/", include("api.urls", namespace="api")),
-    path('s/<str:code>/', ShortLinkNavigate.as_view()),
+    path('s/<str:link_code>/', ShortLinkNavigate.as_view()),
 
 ]
+
+if settings.PROFILING_ENABLED:
+    urlpatterns.append(path('metrics', metrics_view))
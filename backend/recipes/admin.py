@@ -20,7 +20,7 @@ class RecipeAdmin(admin.ModelAdmin):
     inlines = [RecipeIngredientInline]
 
     def favorite_amount(self, obj):
-        return obj.favorite.all().count()
+        return obj.favorites_count
     favorite_amount.short_description = 'Кол-во добавлений в избранное'
 
 
@@ -0,0 +1,58 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from users.models import User
+from .models import Favorite, Recipe, ShoppingCart
+
+
+def change_counter(model, pks, field, delta):
+    model.objects.filter(pk__in=pks).update(**{field: F(field) + delta})
+
+
+def count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def reconcile_recipe_counters():
+    recipes = Recipe.objects.annotate(
+        actual_favorites=count_subquery(Favorite, 'recipe'),
+        actual_cart=count_subquery(ShoppingCart, 'recipe'),
+    ).filter(
+        ~Q(favorites_count=F('actual_favorites'))
+        | ~Q(cart_count=F('actual_cart'))
+    )
+    return refresh_recipe_counters(recipes.values('pk'))
+
+
+def refresh_recipe_counters(recipe_ids):
+    return Recipe.objects.filter(
+        pk__in=recipe_ids
+    ).update(
+        favorites_count=count_subquery(Favorite, 'recipe'),
+        cart_count=count_subquery(ShoppingCart, 'recipe'),
+    )
+
+
+def reconcile_user_counters():
+    users = User.objects.annotate(
+        actual_recipes=count_subquery(Recipe, 'author'),
+    ).exclude(recipes_count=F('actual_recipes'))
+    return refresh_user_counters(users.values('pk'))
+
+
+def refresh_user_counters(user_ids):
+    return User.objects.filter(
+        pk__in=user_ids
+    ).update(
+        recipes_count=count_subquery(Recipe, 'author'),
+    )
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+from django.db.models import Count, Exists, Max, OuterRef, Subquery
+
+from users.models import Sub, User
+from utils.conditional import make_etag
+from .ingredient_index import get_ingredient_index, get_version
+from .models import Favorite, Recipe, ShoppingCart
+from .response_cache import get_version as get_response_version
+
+
+def version_datetime(version):
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
+
+
+def relation_state(model, field):
+    rows = model.objects.filter(
+        **{field: OuterRef('pk')}).order_by().values(field)
+    return (
+        Subquery(rows.annotate(total=Count('pk')).values('total')),
+        Subquery(rows.annotate(last=Max('pk')).values('last')),
+    )
+
+
+def user_state(user):
+    if user.is_anonymous:
+        return None
+    return User.objects.filter(pk=user.pk).values_list(
+        *relation_state(Favorite, 'user'),
+        *relation_state(ShoppingCart, 'user'),
+        *relation_state(Sub, 'sub_from'),
+    ).first()
+
+
+def recipe_list_state(view, request, *args, **kwargs):
+    # Every recipe, ingredient and author change bumps the response
+    # version, so the list is not scanned to compute the tag.
+    return make_etag(
+        sorted(request.query_params.lists()), get_response_version(),
+        user_state(request.user),
+    ), None
+
+
+def recipe_detail_state(view, request, pk=None, *args, **kwargs):
+    user = request.user
+    recipes = Recipe.objects.filter(pk=pk)
+    fields = ['updated_at', 'author__updated_at']
+    if not user.is_anonymous:
+        recipes = recipes.with_user_flags(user).annotate(
+            is_subscribed=Exists(Sub.objects.filter(
+                sub_from=user, sub_to=OuterRef('author'))),
+        )
+        fields += ['is_favorited', 'is_in_shopping_cart', 'is_subscribed']
+    state = recipes.values_list(*fields).first()
+    if state is None:
+        return None, None
+    version = get_version()
+    last_modified = None
+    if user.is_anonymous:
+        last_modified = max(*state, version_datetime(version))
+    return make_etag(pk, *state, version), last_modified
+
+
+def ingredient_list_state(view, request, *args, **kwargs):
+    # The tag follows the index the list is served from, which rechecks
+    # the stored version every few seconds.
+    version = get_ingredient_index().version
+    return make_etag(version), version_datetime(version)
+
+
+def ingredient_detail_state(view, request, pk=None, *args, **kwargs):
+    version = get_version()
+    return make_etag(pk, version), version_datetime(version)
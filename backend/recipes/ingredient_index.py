@@ -0,0 +1,72 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+
+from django.core.cache import cache
+
+from utils.constants import (INGREDIENT_INDEX_CACHE_KEY,
+                             INGREDIENT_INDEX_CHECK_INTERVAL,
+                             INGREDIENT_INDEX_VERSION_KEY, )
+from .models import Ingredient
+from .versions import bump_version, get_version as get_stored_version
+
+PREFIX_END = '\U0010ffff'
+
+
+class IngredientIndex:
+    def __init__(self, rows, version):
+        self.version = version
+        self.checked_at = time.monotonic()
+        rows = sorted(rows, key=lambda row: (row[1].lower(), row[0]))
+        self.keys = [name.lower() for _, name, _ in rows]
+        self.items = [
+            {'id': pk, 'name': name, 'measurement_unit': unit}
+            for pk, name, unit in rows
+        ]
+
+    def search(self, prefix):
+        if not prefix:
+            return self.items
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + PREFIX_END, lo=start)
+        return self.items[start:end]
+
+
+_index = None
+_lock = Lock()
+
+
+def get_version():
+    return get_stored_version(INGREDIENT_INDEX_VERSION_KEY)
+
+
+def load_index():
+    version = get_version()
+    cached_version, rows = cache.get(INGREDIENT_INDEX_CACHE_KEY, (None, None))
+    if cached_version != version:
+        rows = list(Ingredient.objects.values_list(
+            'id', 'name', 'measurement_unit'))
+        cache.set(INGREDIENT_INDEX_CACHE_KEY, (version, rows), timeout=None)
+    return IngredientIndex(rows, version)
+
+
+def get_ingredient_index():
+    global _index
+    with _lock:
+        now = time.monotonic()
+        if _index is not None:
+            if now - _index.checked_at < INGREDIENT_INDEX_CHECK_INTERVAL:
+                return _index
+            if get_version() == _index.version:
+                _index.checked_at = now
+                return _index
+        _index = load_index()
+        return _index
+
+
+def invalidate_ingredient_index():
+    global _index
+    bump_version(INGREDIENT_INDEX_VERSION_KEY)
+    with _lock:
+        _index = None
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from recipes.transfer import export_recipes
+
+
+class Command(BaseCommand):
+    help = 'Выгружает рецепты с ингредиентами в NDJSON файл.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', type=Path, required=True)
+        parser.add_argument(
+            '--author',
+            help='Email автора; без него выгружаются все рецепты.',
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.all()
+        if options['author']:
+            recipes = recipes.filter(author__email=options['author'])
+        exported = 0
+        with open(options['path'], 'wb') as file:
+            for line in export_recipes(recipes):
+                file.write(line)
+                exported += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено {exported} рецептов в {options["path"]}.'))
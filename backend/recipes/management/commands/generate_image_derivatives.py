@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from recipes.response_cache import invalidate_recipe_responses
+from users.models import User
+from utils.images import generate_derivatives, process_uploaded_image
+
+
+class Command(BaseCommand):
+    help = ('Обрабатывает картинки рецептов и аватары, для которых еще нет '
+            'уменьшенных копий на диске.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии, даже если они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        processed = failed = 0
+        sources = (
+            (Recipe.objects.exclude(image='').only('name', 'image'),
+             'image'),
+            (User.objects.exclude(avatar='').exclude(
+                avatar__isnull=True).only('username', 'avatar'),
+             'avatar'),
+        )
+        for queryset, field in sources:
+            for obj in queryset.iterator():
+                try:
+                    if options['force']:
+                        generate_derivatives(getattr(obj, field))
+                    else:
+                        process_uploaded_image(
+                            queryset.model, obj.pk, field)
+                except (OSError, ValueError) as error:
+                    failed += 1
+                    self.stderr.write(f'{obj}: {error}')
+                else:
+                    processed += 1
+        invalidate_recipe_responses()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {processed}, с ошибками: {failed}.'
+        ))
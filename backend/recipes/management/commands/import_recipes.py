@@ -0,0 +1,46 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.transfer import RecipeImport
+from users.models import User
+from utils.constants import RECIPE_TRANSFER_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = ('Загружает рецепты с ингредиентами из NDJSON файла '
+            '(одна строка - один рецепт).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', type=Path, required=True)
+        parser.add_argument(
+            '--author',
+            required=True,
+            help='Email пользователя, от имени которого создаются рецепты.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=RECIPE_TRANSFER_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(email=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["author"]} не найден.')
+
+        started = time.perf_counter()
+        with open(options['path'], 'rb') as file:
+            result = RecipeImport(author, options['batch_size']).run(file)
+        elapsed = time.perf_counter() - started
+
+        for error in result['errors']:
+            self.stderr.write(f'Строка {error["line"]}: ' + json.dumps(
+                error['errors'], ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено {result["created"]} рецептов, пропущено '
+            f'{result["skipped"]}, с ошибками {result["failed"]} '
+            f'за {elapsed:.2f} с ({result["created"] / elapsed:.0f} '
+            f'рецептов/с).'
+        ))
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipes.ingredient_index import invalidate_ingredient_index
+from recipes.models import Ingredient
+
+BATCH_SIZE = 5000
+JSON_CHUNK_SIZE = 64 * 1024
+JSON_ERROR_CONTEXT = 80
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if row:
+            yield row[0].strip(), row[1].strip()
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    for chunk in iter(lambda: file.read(JSON_CHUNK_SIZE), ''):
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started and buffer[position:position + 1] == '[':
+                started = True
+                position += 1
+                continue
+            if buffer[position:position + 1] in ('', ']'):
+                break
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield item['name'].strip(), item['measurement_unit'].strip()
+    # A decode error only means "read more" while the file goes on, the
+    # data still left at its end is malformed.
+    rest = buffer[position:].strip(' \t\r\n,')
+    if rest not in ('', ']'):
+        raise CommandError(
+            f'Некорректный JSON: {rest[:JSON_ERROR_CONTEXT]}')
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV или JSON файла.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=Path,
+            default=settings.BASE_DIR.parent / 'data' / 'ingredients.csv',
+        )
+        parser.add_argument('--format', choices=READERS)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загружать через COPY (только PostgreSQL).',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {path}')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('COPY поддерживается только в PostgreSQL.')
+        load = self.load_copy if options['copy'] else self.load_bulk
+
+        started = time.perf_counter()
+        before = Ingredient.objects.count()
+        processed = 0
+        with open(path, encoding='utf-8') as file, transaction.atomic():
+            for batch in batches(READERS[file_format](file),
+                                 options['batch_size']):
+                load(batch)
+                processed += len(batch)
+        created = Ingredient.objects.count() - before
+        elapsed = time.perf_counter() - started
+        invalidate_ingredient_index()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {processed} строк, добавлено {created} '
+            f'ингредиентов за {elapsed:.2f} с '
+            f'({processed / elapsed:.0f} строк/с).'
+        ))
+
+    def load_bulk(self, batch):
+        Ingredient.objects.bulk_create(
+            (Ingredient(name=name, measurement_unit=unit)
+             for name, unit in batch),
+            batch_size=len(batch),
+            ignore_conflicts=True,
+        )
+
+    def load_copy(self, batch):
+        table = Ingredient._meta.db_table
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS ingredient_import '
+                '(name text, measurement_unit text) ON COMMIT DELETE ROWS'
+            )
+            cursor.copy_expert(
+                'COPY ingredient_import (name, measurement_unit) '
+                'FROM STDIN WITH (FORMAT csv)',
+                buffer,
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT DISTINCT name, measurement_unit '
+                'FROM ingredient_import '
+                'ON CONFLICT ON CONSTRAINT unique_ingredients DO NOTHING'
+            )
+            cursor.execute('TRUNCATE ingredient_import')
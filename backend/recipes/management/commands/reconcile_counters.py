@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import (reconcile_recipe_counters,
+                              reconcile_user_counters, )
+from recipes.shopping_totals import refresh_shopping_totals
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счетчики избранного, списков покупок и рецептов '
+            'и исправляет расхождения, пересобирает итоги списков покупок.')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        recipes = reconcile_recipe_counters()
+        users = reconcile_user_counters()
+        refresh_shopping_totals()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено рецептов: {recipes}, пользователей: {users}.'
+        ))
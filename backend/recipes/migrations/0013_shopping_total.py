@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_shopping_totals(apps, schema_editor):
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    ShoppingTotal = apps.get_model('recipes', 'ShoppingTotal')
+    rows = RecipeIngredient.objects.filter(
+        recipe__shopping_cart__isnull=False,
+    ).values(
+        'ingredient', 'recipe__shopping_cart__user',
+    ).annotate(total=Sum('amount')).iterator(chunk_size=2000)
+    ShoppingTotal.objects.bulk_create(
+        (ShoppingTotal(ingredient_id=row['ingredient'],
+                       user_id=row['recipe__shopping_cart__user'],
+                       amount=row['total'])
+         for row in rows),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField(verbose_name='Суммарное количество')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.ingredient', verbose_name='Ингредиент')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Итог списка покупок',
+                'verbose_name_plural': 'Итоги списков покупок',
+                'default_related_name': 'shopping_totals',
+                'constraints': [models.UniqueConstraint(fields=('user', 'ingredient'), name='unique_shopping_total')],
+            },
+        ),
+        migrations.RunPython(fill_shopping_totals, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,21 @@
 import string
 import random
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import Exists, OuterRef, Prefetch, Value, Window
+from django.db.models.functions import RowNumber, Upper
 from django.core.validators import MinValueValidator
 
 from users.models import User
+from utils.models import CounterFieldsMixin
 from utils.constants import (INGREDIENT_MAX_LEN, MEASUREMENT_UNIT_MAX_LEN,
                              RECIPE_MAX_LEN, RECIPE_COOKING_TIME_VALIDATOR,
                              RECIPEINGREDIENT_AMOUNT_VALIDATOR,
                              SHORTLINK_CODE_LEN, RECIPE_COOKING_TIME_LEN,
-                             RECIPEINGREDIENT_AMOUNT_LEN, )
+                             RECIPEINGREDIENT_AMOUNT_LEN,
+                             RECIPE_SEARCH_CONFIG, CACHE_VERSION_NAME_LEN, )
 
 
 class Ingredient(models.Model):
@@ -39,11 +45,62 @@ class Ingredient(models.Model):
         return self.name
 
 
-class Recipe(models.Model):
+RECIPE_SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=RECIPE_SEARCH_CONFIG)
+    + SearchVector('text', weight='B', config=RECIPE_SEARCH_CONFIG)
+)
+
+
+class RecipeQuerySet(models.QuerySet):
+    def update_search_vector(self):
+        return self.update(search_vector=RECIPE_SEARCH_VECTOR)
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+            )
+        return self.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+        )
+
+    def latest_per_author(self, limit):
+        return self.annotate(
+            author_position=Window(
+                RowNumber(),
+                partition_by='author',
+                order_by=('-pub_date', '-id'),
+            ),
+        ).filter(author_position__lte=limit)
+
+    def for_listing(self, user):
+        return self.with_user_flags(user).defer(
+            'search_vector'
+        ).prefetch_related(
+            Prefetch(
+                'author',
+                queryset=User.objects.with_is_subscribed(user),
+            ),
+            Prefetch(
+                'recipe_ingredients',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'),
+            ),
+        )
+
+
+class Recipe(CounterFieldsMixin, models.Model):
+    counter_fields = ('favorites_count', 'cart_count')
+
     author = models.ForeignKey(
         User,
         verbose_name='Автор рецепта',
         on_delete=models.CASCADE,
+        db_index=False,
     )
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -75,6 +132,27 @@ class Recipe(models.Model):
         'Дата публикации рецепта',
         auto_now_add=True,
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения рецепта',
+        auto_now=True,
+    )
+    favorites_count = models.PositiveIntegerField(
+        'Кол-во добавлений в избранное',
+        default=0,
+        editable=False,
+    )
+    cart_count = models.PositiveIntegerField(
+        'Кол-во добавлений в список покупок',
+        default=0,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
@@ -87,10 +165,34 @@ class Recipe(models.Model):
                 name='unique_recipes'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='recipe_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='recipe_author_pub_date_idx',
+            ),
+            GinIndex(
+                fields=['search_vector'],
+                name='recipe_search_vector_idx',
+            ),
+            GinIndex(
+                OpClass(Upper('name'), name='gin_trgm_ops'),
+                name='recipe_name_trgm_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'name', 'text'} & set(update_fields):
+            Recipe.objects.filter(pk=self.pk).update_search_vector()
+
 
 class RecipeIngredient(models.Model):
     recipe = models.ForeignKey(
@@ -131,11 +233,13 @@ class UserRecipe(models.Model):
         User,
         on_delete=models.CASCADE,
         verbose_name="Пользователь",
+        db_index=False,
     )
     recipe = models.ForeignKey(
         Recipe,
         on_delete=models.CASCADE,
         verbose_name="Рецепт",
+        db_index=False,
     )
 
     class Meta:
@@ -146,7 +250,12 @@ class UserRecipe(models.Model):
                 name="unique_user_recipe_%(class)s"
             )
         ]
-        ordering = ("-user",)
+        indexes = [
+            models.Index(
+                fields=["recipe", "user"],
+                name="%(class)s_recipe_user_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} {self.recipe}"
@@ -166,6 +275,51 @@ class Favorite(UserRecipe):
         default_related_name = "favorite"
 
 
+class ShoppingTotal(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        db_index=False,
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name='Ингредиент',
+    )
+    amount = models.IntegerField('Суммарное количество')
+
+    class Meta:
+        verbose_name = 'Итог списка покупок'
+        verbose_name_plural = 'Итоги списков покупок'
+        default_related_name = 'shopping_totals'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shopping_total'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} {self.ingredient} - {self.amount}'
+
+
+class CacheVersion(models.Model):
+    name = models.CharField(
+        'Название',
+        max_length=CACHE_VERSION_NAME_LEN,
+        primary_key=True,
+    )
+    value = models.BigIntegerField('Версия')
+
+    class Meta:
+        verbose_name = 'Версия кеша'
+        verbose_name_plural = 'Версии кеша'
+
+    def __str__(self):
+        return f'{self.name} - {self.value}'
+
+
 class ShortLink(models.Model):
     recipe_to_link = models.OneToOneField(
         Recipe,
@@ -0,0 +1,64 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from utils.constants import (RECIPE_RESPONSE_CACHE_KEY,
+                             RECIPE_RESPONSE_CACHE_TIMEOUT,
+                             RECIPE_RESPONSE_VERSION_KEY, )
+from .versions import bump_version, get_version as get_stored_version
+
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_version():
+    return get_stored_version(RECIPE_RESPONSE_VERSION_KEY)
+
+
+def invalidate_recipe_responses():
+    bump_version(RECIPE_RESPONSE_VERSION_KEY)
+
+
+def response_cache_key(request):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f'{request.build_absolute_uri(request.path)}?{query}'
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f'{RECIPE_RESPONSE_CACHE_KEY}:{get_version()}:{digest}'
+
+
+def cached_response(request, data, headers):
+    response = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(headers.get('Last-Modified')),
+    )
+    if response is None:
+        response = Response(data)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def cache_anonymous(method):
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return method(self, request, *args, **kwargs)
+        key = response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached_response(request, *cached)
+        response = method(self, request, *args, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200:
+            headers = {
+                name: response[name] for name in CACHED_HEADERS
+                if response.has_header(name)
+            }
+            cache.set(key, (response.data, headers),
+                      RECIPE_RESPONSE_CACHE_TIMEOUT)
+        return response
+    return wrapper
@@ -1,12 +1,26 @@
+import posixpath
+from functools import cached_property
+
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework.exceptions import ValidationError
 
-from users.serializers import UserSerializer
-from .models import Ingredient, Recipe, RecipeIngredient
+from users.serializers import UserReadSerializer, UserSerializer
+from utils.fields import DeferredBase64ImageField
+from utils.constants import (INGREDIENT_MAX_LEN, MEASUREMENT_UNIT_MAX_LEN,
+                             POSITIVE_SMALL_INT_MAX, RECIPE_COOKING_TIME_LEN,
+                             RECIPE_MAX_LEN, RECIPEINGREDIENT_AMOUNT_LEN, )
+from utils.images import derivative_urls
+from utils.links import remove_links
+from utils.profiling import ProfiledListSerializer, ProfiledSerializerMixin
+from utils.serializers import ReadOnlySerializer
+from .models import Ingredient, Recipe, RecipeIngredient, ShoppingCart
+from .shopping_totals import refresh_shopping_totals
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(ProfiledSerializerMixin,
+                           serializers.ModelSerializer):
     class Meta:
         model = Ingredient
         fields = (
@@ -15,6 +29,7 @@ class IngredientSerializer(serializers.ModelSerializer):
             'measurement_unit',
         )
         read_only_fields = fields
+        list_serializer_class = ProfiledListSerializer
 
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
@@ -34,7 +49,8 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         )
 
 
-class RecipeListSerializer(serializers.ModelSerializer):
+class RecipeListSerializer(ProfiledSerializerMixin,
+                           serializers.ModelSerializer):
     author = UserSerializer()
     ingredients = RecipeIngredientSerializer(
         source='recipe_ingredients',
@@ -42,15 +58,22 @@ class RecipeListSerializer(serializers.ModelSerializer):
     )
     is_in_shopping_cart = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = (
             'id', 'author', 'ingredients', 'is_in_shopping_cart',
-            'is_favorited', 'name', 'image', 'text', 'cooking_time',
+            'is_favorited', 'name', 'image', 'image_variants', 'text',
+            'cooking_time',
         )
 
+    def get_image_variants(self, obj):
+        return derivative_urls(obj.image, self.context.get('request'))
+
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context.get('request').user
         return (
             not user.is_anonymous
@@ -58,6 +81,8 @@ class RecipeListSerializer(serializers.ModelSerializer):
         )
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context.get('request').user
         return (
             not user.is_anonymous
@@ -65,10 +90,37 @@ class RecipeListSerializer(serializers.ModelSerializer):
         )
 
 
+class RecipeReadSerializer(ReadOnlySerializer):
+    @cached_property
+    def author_serializer(self):
+        return UserReadSerializer(context=self.context)
+
+    def to_representation(self, instance):
+        return {
+            'id': instance.id,
+            'author': self.author_serializer.to_representation(
+                instance.author),
+            'ingredients': [
+                {
+                    'id': item.ingredient.id,
+                    'name': item.ingredient.name,
+                    'measurement_unit': item.ingredient.measurement_unit,
+                    'amount': item.amount,
+                }
+                for item in instance.recipe_ingredients.all()
+            ],
+            'is_in_shopping_cart': instance.is_in_shopping_cart,
+            'is_favorited': instance.is_favorited,
+            'name': instance.name,
+            'image': self.image_url(instance.image),
+            'image_variants': self.image_variants(instance.image),
+            'text': instance.text,
+            'cooking_time': instance.cooking_time,
+        }
+
+
 class NewIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all(),
-    )
+    id = serializers.IntegerField()
     amount = serializers.IntegerField()
 
     class Meta:
@@ -85,12 +137,13 @@ class NewIngredientSerializer(serializers.ModelSerializer):
         return value
 
 
-class RecipeWriteSerializer(serializers.ModelSerializer):
+class RecipeWriteSerializer(ProfiledSerializerMixin,
+                            serializers.ModelSerializer):
     ingredients = NewIngredientSerializer(
         many=True,
         write_only=True,
     )
-    image = Base64ImageField(required=True, allow_null=False)
+    image = DeferredBase64ImageField(required=True, allow_null=False)
     author = serializers.HiddenField(
         default=serializers.CurrentUserDefault(),
     )
@@ -121,35 +174,36 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
                 },
             )
 
-        ingredients = []
+        known = set(Ingredient.objects.filter(
+            id__in={ingredient['id'] for ingredient in value}
+        ).values_list('id', flat=True))
+        seen = set()
+        errors = []
         for ingredient in value:
-            if ingredient in ingredients:
-                raise ValidationError(
-                    {'ingredients': [
-                        'Ингридиенты повторяются!'
-                    ]
-                    },
-                )
-            if int(ingredient['amount']) <= 0:
-                raise ValidationError(
-                    {'amount': [
-                        'Количество должно быть больше 0!'
-                    ]
-                    },
-                )
-
-            ingredients.append(ingredient)
-        self._validated_ingredients = ingredients
+            if ingredient['id'] not in known:
+                errors.append({'id': ['Ингредиент не найден.']})
+            elif ingredient['id'] in seen:
+                errors.append({'id': ['Ингридиенты повторяются!']})
+            else:
+                errors.append({})
+            seen.add(ingredient['id'])
+        if any(errors):
+            raise ValidationError(errors)
+        self._validated_ingredients = value
         return value
 
     def to_representation(self, instance):
+        prefetch_related_objects([instance], Prefetch(
+            'recipe_ingredients',
+            queryset=RecipeIngredient.objects.select_related('ingredient'),
+        ))
         return RecipeListSerializer(instance, context=self.context).data
 
     def add_ingredients(self, recipe):
         RecipeIngredient.objects.bulk_create([
             RecipeIngredient(
                 recipe=recipe,
-                ingredient=ingredient['id'],
+                ingredient_id=ingredient['id'],
                 amount=ingredient['amount']
             ) for ingredient in self._validated_ingredients
         ])
@@ -167,15 +221,99 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         self.add_ingredients(recipe)
         return recipe
 
+    def sync_ingredients(self, recipe):
+        submitted = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in self._validated_ingredients
+        }
+        existing = {
+            row.ingredient_id: row for row in recipe.recipe_ingredients.all()
+        }
+        changed = []
+        for ingredient_id, row in existing.items():
+            amount = submitted.get(ingredient_id)
+            if amount is not None and amount != row.amount:
+                row.amount = amount
+                changed.append(row)
+        removed = [
+            row for ingredient_id, row in existing.items()
+            if ingredient_id not in submitted
+        ]
+        added = [
+            RecipeIngredient(recipe=recipe, ingredient_id=ingredient_id,
+                             amount=amount)
+            for ingredient_id, amount in submitted.items()
+            if ingredient_id not in existing
+        ]
+        if removed:
+            remove_links(
+                RecipeIngredient, 'ingredient',
+                [row.ingredient_id for row in removed], recipe=recipe,
+            )
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ['amount'])
+        if added:
+            RecipeIngredient.objects.bulk_create(added)
+        if removed or changed or added:
+            refresh_shopping_totals(
+                ShoppingCart.objects.filter(recipe=recipe).values('user'),
+                [row.ingredient_id for row in removed + changed + added],
+            )
+
     def update(self, instance, validated_data):
         validated_data.pop('ingredients', None)
-        instance.ingredients.clear()
-        self.add_ingredients(instance)
-        return super().update(instance, validated_data)
+        with transaction.atomic():
+            self.sync_ingredients(instance)
+            return super().update(instance, validated_data)
+
+
+class IngredientImportSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=INGREDIENT_MAX_LEN)
+    measurement_unit = serializers.CharField(
+        max_length=MEASUREMENT_UNIT_MAX_LEN)
+    amount = serializers.IntegerField(
+        min_value=RECIPEINGREDIENT_AMOUNT_LEN,
+        max_value=POSITIVE_SMALL_INT_MAX,
+    )
 
 
-class RecipeForCartSerializer(serializers.ModelSerializer):
+class RecipeImportSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=RECIPE_MAX_LEN)
+    text = serializers.CharField()
+    cooking_time = serializers.IntegerField(
+        min_value=RECIPE_COOKING_TIME_LEN,
+        max_value=POSITIVE_SMALL_INT_MAX,
+    )
+    image = serializers.CharField(
+        max_length=Recipe._meta.get_field('image').max_length)
+    ingredients = IngredientImportSerializer(many=True, allow_empty=False)
+
+    def validate_image(self, value):
+        field = Recipe._meta.get_field('image')
+        if (not value.startswith(field.upload_to)
+                or posixpath.normpath(value) != value):
+            raise serializers.ValidationError(
+                f'Укажите путь к картинке в хранилище: {field.upload_to}...')
+        if not field.storage.exists(value):
+            raise serializers.ValidationError(
+                f'Картинка {value} не найдена в хранилище.')
+        return value
+
+    def validate_ingredients(self, value):
+        keys = {(item['name'], item['measurement_unit']) for item in value}
+        if len(keys) != len(value):
+            raise serializers.ValidationError('Ингридиенты повторяются!')
+        return value
+
+
+class RecipeForCartSerializer(ProfiledSerializerMixin,
+                              serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'cooking_time', 'image',)
+        fields = ('id', 'name', 'cooking_time', 'image', 'image_variants',)
         read_only_fields = fields
+
+    def get_image_variants(self, obj):
+        return derivative_urls(obj.image, self.context.get('request'))
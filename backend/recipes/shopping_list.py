@@ -0,0 +1,105 @@
+import csv
+import io
+import os
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Case, F, Sum, Value, When
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from utils.constants import (SHOPPING_LIST_CHUNK_SIZE,
+                             SHOPPING_LIST_PDF_FONT_SIZE,
+                             SHOPPING_LIST_PDF_MARGIN, UNIT_CONVERSIONS, )
+from .models import ShoppingTotal
+
+
+def convert_unit(field, index, default):
+    units = defaultdict(list)
+    for unit, conversion in UNIT_CONVERSIONS.items():
+        if conversion[index] != getattr(default, 'value', None):
+            units[conversion[index]].append(unit)
+    return Case(
+        *(When(**{f'{field}__in': group}, then=Value(value))
+          for value, group in units.items()),
+        default=default,
+    )
+
+
+def shopping_list_rows(user):
+    unit_field = 'ingredient__measurement_unit'
+    return ShoppingTotal.objects.filter(
+        user=user
+    ).values(
+        name=F('ingredient__name'),
+        unit=convert_unit(unit_field, 0, F(unit_field)),
+    ).annotate(
+        sum=Sum(F('amount') * convert_unit(unit_field, 1, Value(1)))
+    ).order_by(
+        'name', 'unit'
+    ).iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+
+
+def format_row(row):
+    return f"{row['name']} - {row['sum']} ({row['unit']})"
+
+
+def txt_stream(rows):
+    for row in rows:
+        yield format_row(row) + '\n'
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('Ингредиент', 'Количество', 'Единица измерения'))
+    for row in rows:
+        yield writer.writerow((
+            row['name'],
+            row['sum'],
+            row['unit'],
+        ))
+
+
+def get_pdf_font():
+    font_path = settings.SHOPPING_LIST_PDF_FONT
+    if not os.path.exists(font_path):
+        return 'Helvetica'
+    font_name = os.path.splitext(os.path.basename(font_path))[0]
+    if font_name not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(font_name, font_path))
+    return font_name
+
+
+def pdf_stream(rows):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    font = get_pdf_font()
+    _, height = A4
+    top = height - SHOPPING_LIST_PDF_MARGIN
+    line_height = SHOPPING_LIST_PDF_FONT_SIZE * 1.5
+
+    pdf.setFont(font, SHOPPING_LIST_PDF_FONT_SIZE)
+    y = top
+    for row in rows:
+        if y < SHOPPING_LIST_PDF_MARGIN:
+            pdf.showPage()
+            pdf.setFont(font, SHOPPING_LIST_PDF_FONT_SIZE)
+            y = top
+        pdf.drawString(SHOPPING_LIST_PDF_MARGIN, y, format_row(row))
+        y -= line_height
+    pdf.save()
+    yield buffer.getvalue()
+
+
+STREAMS = {
+    'txt': txt_stream,
+    'csv': csv_stream,
+    'pdf': pdf_stream,
+}
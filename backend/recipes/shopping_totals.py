@@ -0,0 +1,73 @@
+from django.db import connections, router, transaction
+from django.db.models import Sum, Value
+
+from users.models import User
+from .models import RecipeIngredient, ShoppingTotal
+
+
+def lock_users(users=None):
+    # Delta updates and rebuilds of the same user's totals are
+    # serialized on the user row, otherwise a rebuild that already sees
+    # a new cart row can be followed by the delta for it.
+    queryset = User.objects.select_for_update(no_key=True).order_by('pk')
+    if users is not None:
+        queryset = queryset.filter(pk__in=users)
+    return list(queryset.values_list('pk', flat=True))
+
+
+def insert_totals(rows, columns, update):
+    connection = connections[router.db_for_write(ShoppingTotal)]
+    quote = connection.ops.quote_name
+    table = quote(ShoppingTotal._meta.db_table)
+    select, params = rows.query.sql_with_params()
+    sql = (
+        f'INSERT INTO {table} '
+        f'({", ".join(quote(column) for column in columns)}) {select} '
+        'ON CONFLICT (user_id, ingredient_id) DO UPDATE '
+        f'SET amount = {update.format(table=table)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def change_shopping_totals(user_id, recipe_ids, sign):
+    if not recipe_ids:
+        return
+    with transaction.atomic(savepoint=False):
+        lock_users([user_id])
+        insert_totals(
+            RecipeIngredient.objects.filter(
+                recipe__in=recipe_ids,
+            ).values('ingredient').annotate(
+                user=Value(user_id),
+                total=Sum('amount') * sign,
+            ),
+            ('ingredient_id', 'user_id', 'amount'),
+            '{table}.amount + EXCLUDED.amount',
+        )
+        if sign < 0:
+            ShoppingTotal.objects.filter(
+                user=user_id, amount__lte=0).delete()
+
+
+def refresh_shopping_totals(users=None, ingredients=None):
+    totals = {}
+    rows = {'recipe__shopping_cart__isnull': False}
+    with transaction.atomic(savepoint=False):
+        locked = lock_users(users)
+        if users is not None:
+            if not locked:
+                return
+            totals['user__in'] = locked
+            rows['recipe__shopping_cart__user__in'] = locked
+        if ingredients is not None:
+            totals['ingredient__in'] = ingredients
+            rows['ingredient__in'] = ingredients
+        ShoppingTotal.objects.filter(**totals).delete()
+        insert_totals(
+            RecipeIngredient.objects.filter(**rows).values(
+                'ingredient', 'recipe__shopping_cart__user',
+            ).annotate(total=Sum('amount')),
+            ('ingredient_id', 'user_id', 'amount'),
+            'EXCLUDED.amount',
+        )
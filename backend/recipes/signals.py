@@ -0,0 +1,126 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import User
+from utils.images import process_uploaded_image
+from utils.links import links_changed
+from utils.tasks import submit
+from .counters import change_counter
+from .ingredient_index import invalidate_ingredient_index
+from .models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                     ShoppingCart, )
+from .response_cache import invalidate_recipe_responses
+from .shopping_totals import change_shopping_totals, refresh_shopping_totals
+
+AUTHOR_FIELDS = {'email', 'username', 'first_name', 'last_name', 'avatar'}
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_ingredient_index)
+    transaction.on_commit(invalidate_recipe_responses)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_recipe_responses)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def author_changed(sender, update_fields=None, **kwargs):
+    if update_fields is None or AUTHOR_FIELDS & set(update_fields):
+        transaction.on_commit(invalidate_recipe_responses)
+
+
+LINK_COUNTERS = {Favorite: 'favorites_count', ShoppingCart: 'cart_count'}
+
+
+def deleted_directly(origin, model):
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+
+@receiver(links_changed, sender=Favorite)
+@receiver(links_changed, sender=ShoppingCart)
+def recipe_links_changed(sender, owner, ids, delta, cascade=False, **kwargs):
+    change_counter(Recipe, ids, LINK_COUNTERS[sender], delta)
+    # Deleting a user drops their totals by cascade, deleting a recipe
+    # is handled by recipe_deleting below.
+    if sender is ShoppingCart and not cascade:
+        change_shopping_totals(owner['user'], ids, delta)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def recipe_link_created(sender, instance, created, **kwargs):
+    if created:
+        recipe_links_changed(
+            sender, {'user': instance.user_id}, [instance.recipe_id], 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def recipe_link_deleted(sender, instance, origin=None, **kwargs):
+    recipe_links_changed(
+        sender, {'user': instance.user_id}, [instance.recipe_id], -1,
+        cascade=not deleted_directly(origin, sender),
+    )
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def recipe_ingredient_saved(sender, instance, **kwargs):
+    refresh_shopping_totals(
+        ShoppingCart.objects.filter(
+            recipe=instance.recipe_id).values('user'),
+        [instance.ingredient_id],
+    )
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_deleted(sender, instance, origin=None, **kwargs):
+    if deleted_directly(origin, RecipeIngredient):
+        recipe_ingredient_saved(sender, instance)
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleting(sender, instance, **kwargs):
+    instance.cart_users = list(ShoppingCart.objects.filter(
+        recipe=instance).values_list('user', flat=True))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, [instance.author_id], 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    change_counter(User, [instance.author_id], 'recipes_count', -1)
+    if getattr(instance, 'cart_users', None):
+        refresh_shopping_totals(instance.cart_users)
+
+
+def process_recipe_images(recipe_ids):
+    processed = [
+        recipe_id for recipe_id in recipe_ids
+        if process_uploaded_image(Recipe, recipe_id, 'image')
+    ]
+    if processed:
+        invalidate_recipe_responses()
+
+
+def process_recipe_image(recipe_id):
+    process_recipe_images([recipe_id])
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    transaction.on_commit(partial(submit, process_recipe_image, instance.pk))
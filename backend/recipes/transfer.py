@@ -0,0 +1,179 @@
+import logging
+from functools import partial
+from itertools import islice
+
+import orjson
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import DatabaseError, transaction
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+from utils.constants import (RECIPE_TRANSFER_BATCH_SIZE,
+                             RECIPE_TRANSFER_MAX_ERRORS, )
+from utils.images import copy_image
+from utils.tasks import submit
+from .counters import refresh_user_counters
+from .models import Ingredient, Recipe, RecipeIngredient
+from .response_cache import invalidate_recipe_responses
+from .serializers import RecipeImportSerializer
+from .signals import process_recipe_images
+
+logger = logging.getLogger(__name__)
+
+
+def export_recipes(recipes, batch_size=RECIPE_TRANSFER_BATCH_SIZE):
+    recipes = recipes.order_by('pub_date', 'id').only(
+        'id', 'name', 'text', 'cooking_time', 'image',
+    ).prefetch_related(
+        Prefetch(
+            'recipe_ingredients',
+            queryset=RecipeIngredient.objects.select_related(
+                'ingredient').order_by('id'),
+        ),
+    )
+    for recipe in recipes.iterator(chunk_size=batch_size):
+        yield orjson.dumps({
+            'name': recipe.name,
+            'text': recipe.text,
+            'cooking_time': recipe.cooking_time,
+            'image': recipe.image.name,
+            'ingredients': [
+                {
+                    'name': item.ingredient.name,
+                    'measurement_unit': item.ingredient.measurement_unit,
+                    'amount': item.amount,
+                }
+                for item in recipe.recipe_ingredients.all()
+            ],
+        }) + b'\n'
+
+
+class RecipeImport:
+    def __init__(self, author, batch_size=RECIPE_TRANSFER_BATCH_SIZE):
+        self.author = author
+        self.batch_size = batch_size
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+        self.serializer = RecipeImportSerializer()
+
+    def run(self, lines):
+        rows = self.parse(lines)
+        while batch := list(islice(rows, self.batch_size)):
+            recipes = self.prepare(batch)
+            if not recipes:
+                continue
+            try:
+                with transaction.atomic():
+                    self.save(recipes)
+            except (DatabaseError, OSError,
+                    SuspiciousFileOperation) as error:
+                # A name taken by a concurrent import, a value the
+                # database rejects or a missing image fails this batch
+                # only, the batches before it stay committed.
+                logger.warning('Пачка рецептов не сохранена: %s', error)
+                for number, *_ in recipes:
+                    self.fail(number, ['Рецепт не сохранен: пачка, в '
+                                       'которой он был, не записана.'])
+            else:
+                self.created += len(recipes)
+        if self.created:
+            refresh_user_counters([self.author.pk])
+            invalidate_recipe_responses()
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+    def fail(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < RECIPE_TRANSFER_MAX_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def parse(self, lines):
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                data = orjson.loads(line)
+            except orjson.JSONDecodeError as error:
+                self.fail(number, [f'JSON parse error - {error}'])
+                continue
+            try:
+                yield number, self.serializer.run_validation(data)
+            except ValidationError as error:
+                self.fail(number, error.detail)
+
+    def prepare(self, batch):
+        names = {data['name'] for _, data in batch}
+        taken = set(Recipe.objects.filter(
+            author=self.author, name__in=names,
+        ).values_list('name', flat=True))
+        ingredients = {
+            (name, unit): pk
+            for pk, name, unit in Ingredient.objects.filter(
+                name__in={
+                    item['name']
+                    for _, data in batch for item in data['ingredients']
+                },
+            ).values_list('id', 'name', 'measurement_unit')
+        }
+
+        recipes = []
+        for number, data in batch:
+            if data['name'] in taken:
+                self.skipped += 1
+                continue
+            missing = [
+                f'{item["name"]} ({item["measurement_unit"]})'
+                for item in data['ingredients']
+                if (item['name'], item['measurement_unit']) not in ingredients
+            ]
+            if missing:
+                self.fail(number, {'ingredients': [
+                    'Ингредиенты не найдены: ' + ', '.join(missing)]})
+                continue
+            taken.add(data['name'])
+            recipes.append((number, Recipe(
+                author=self.author,
+                name=data['name'],
+                text=data['text'],
+                cooking_time=data['cooking_time'],
+            ), data['image'], [
+                (ingredients[item['name'], item['measurement_unit']],
+                 item['amount'])
+                for item in data['ingredients']
+            ]))
+        return recipes
+
+    def save(self, recipes):
+        # Every recipe gets its own copy of the image: processing an
+        # image replaces its file, which would break other recipes that
+        # point to the same path.
+        field = Recipe._meta.get_field('image')
+        copies = []
+        try:
+            for _, recipe, image, _ in recipes:
+                recipe.image = copy_image(
+                    field.storage, image, field.max_length)
+                copies.append(recipe.image.name)
+            Recipe.objects.bulk_create(
+                recipe for _, recipe, _, _ in recipes)
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe, ingredient_id=ingredient, amount=amount)
+                for _, recipe, _, items in recipes
+                for ingredient, amount in items
+            )
+            ids = [recipe.pk for _, recipe, _, _ in recipes]
+            Recipe.objects.filter(pk__in=ids).update_search_vector()
+        except Exception:
+            for name in copies:
+                field.storage.delete(name)
+            raise
+        # bulk_create sends no post_save, so the images are queued for
+        # processing here once the batch is committed.
+        transaction.on_commit(partial(submit, process_recipe_images, ids))
@@ -0,0 +1,26 @@
+import time
+
+from .models import CacheVersion
+
+
+def get_version(name):
+    # Versions live in the database: commands and every worker process
+    # see the same value even when the cache backend is per process.
+    version = CacheVersion.objects.filter(
+        name=name).values_list('value', flat=True).first()
+    if version is None:
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(name=name, value=time.time_ns())],
+            ignore_conflicts=True,
+        )
+        return get_version(name)
+    return version
+
+
+def bump_version(name):
+    CacheVersion.objects.bulk_create(
+        [CacheVersion(name=name, value=time.time_ns())],
+        update_conflicts=True,
+        unique_fields=['name'],
+        update_fields=['value'],
+    )
@@ -1,115 +1,154 @@
+from itertools import islice
+
 from rest_framework import viewsets, status, views
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.permissions import SAFE_METHODS
 from django.shortcuts import get_object_or_404, redirect
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 
-from utils.pagination import FoodgramPagination
+from utils.bulk import bulk_add, bulk_remove
+from utils.conditional import conditional_get
+from utils.links import add_link, remove_link
+from utils.pagination import (FoodgramPagination,
+                              OptionalCursorPaginationMixin, )
 from utils.permissions import IsAuthorOrReadOnly
 from utils.filters import RecipeFilterSet
+from utils.constants import (RECIPE_IMPORT_MAX_LINES, RECIPE_IMPORT_MAX_SIZE,
+                             RECIPE_TRANSFER_FILENAME,
+                             SHOPPING_LIST_FILENAME, )
+from utils.parsers import NDJSONParser
+from utils.renderers import (PlainTextRenderer, CSVRenderer, PDFRenderer,
+                             NDJSONRenderer, )
+from utils.serializers import BulkIdsSerializer
+from .etags import (ingredient_detail_state, ingredient_list_state,
+                    recipe_detail_state, recipe_list_state, )
 from .models import (Recipe, Ingredient, ShoppingCart, Favorite,
-                     ShortLink, RecipeIngredient, )
-from .serializers import (RecipeListSerializer, RecipeWriteSerializer,
+                     ShortLink, )
+from .serializers import (RecipeReadSerializer, RecipeWriteSerializer,
                           IngredientSerializer, RecipeForCartSerializer, )
+from .ingredient_index import get_ingredient_index
+from .response_cache import cache_anonymous
+from .shopping_list import STREAMS, shopping_list_rows
+from .transfer import RecipeImport, export_recipes
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     pagination_class = FoodgramPagination
     permission_classes = [IsAuthorOrReadOnly]
     filterset_class = RecipeFilterSet
     filter_backends = [DjangoFilterBackend]
+    lookup_value_regex = r'\d+'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            return queryset.for_listing(self.request.user)
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
-            return RecipeListSerializer
+            return RecipeReadSerializer
         return RecipeWriteSerializer
 
+    @cache_anonymous
+    @conditional_get(recipe_list_state)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_anonymous
+    @conditional_get(recipe_detail_state)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(['post', 'delete'],
             detail=True,
             permission_classes=[IsAuthenticated])
     def shopping_cart(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        shopping_cart = ShoppingCart.objects.filter(user=request.user,
-                                                    recipe=recipe)
-        if request.method == 'POST':
-            if shopping_cart.exists():
-                return Response(
-                    'Нельзя добавить рецепт, уже добавленный в корзину!',
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            ShoppingCart.objects.create(user=request.user, recipe=recipe)
-            serializer = RecipeForCartSerializer(recipe)
-            return Response(
-                serializer.data,
-                status=status.HTTP_201_CREATED,
-            )
-
-        if request.method == 'DELETE':
-            cart_item = shopping_cart.first()
-            if not cart_item:
-                return Response(
-                    'Нельзя удалить несуществующий рецепт из корзины!',
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            cart_item.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
+        return self.toggle_recipe(
+            request, pk, ShoppingCart,
+            'Нельзя добавить рецепт, уже добавленный в корзину!',
+            'Нельзя удалить несуществующий рецепт из корзины!',
+        )
 
     @action(['post', 'delete'],
             detail=True,
             permission_classes=[IsAuthenticated])
     def favorite(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
+        return self.toggle_recipe(
+            request, pk, Favorite,
+            'Нельзя добавить рецепт, уже добавленный в избранное!',
+            'Нельзя удалить несуществующий рецепт из избранного!',
+        )
 
+    def toggle_recipe(self, request, pk, model,
+                      exists_message, missing_message):
         if request.method == 'POST':
-            if Favorite.objects.filter(
-                    user=request.user, recipe=recipe).exists():
+            recipe = get_object_or_404(Recipe, pk=pk)
+            if not add_link(model, 'recipe', recipe.id, user=request.user):
                 return Response(
-                    'Нельзя добавить рецепт, уже добавленный в корзину!',
+                    exists_message,
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            Favorite.objects.create(user=request.user, recipe=recipe)
             serializer = RecipeForCartSerializer(recipe)
             return Response(
                 serializer.data,
                 status=status.HTTP_201_CREATED,
             )
 
-        if request.method == 'DELETE':
-            fav_item = Favorite.objects.filter(
-                user=request.user,
-                recipe=recipe
-            ).first()
-            if not fav_item:
-                return Response(
-                    'Нельзя удалить несуществующий рецепт из избранного!',
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            fav_item.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
+        if not remove_link(model, 'recipe', int(pk), user=request.user):
+            get_object_or_404(Recipe, pk=pk)
+            return Response(
+                missing_message,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @action(['get'],
+    @action(['post', 'delete'],
             detail=False,
+            url_path='favorite/bulk',
             permission_classes=[IsAuthenticated])
+    def favorite_bulk(self, request):
+        return self.apply_bulk(request, Favorite)
+
+    @action(['post', 'delete'],
+            detail=False,
+            url_path='shopping_cart/bulk',
+            permission_classes=[IsAuthenticated])
+    def shopping_cart_bulk(self, request):
+        return self.apply_bulk(request, ShoppingCart)
+
+    def apply_bulk(self, request, model):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        if request.method == 'POST':
+            results, _ = bulk_add(
+                model, 'recipe', Recipe.objects.all(), ids,
+                user=request.user)
+        else:
+            results, _ = bulk_remove(model, 'recipe', ids, user=request.user)
+        return Response(results)
+
+    @action(['get'],
+            detail=False,
+            permission_classes=[IsAuthenticated],
+            renderer_classes=[PlainTextRenderer, CSVRenderer, PDFRenderer])
     def download_shopping_cart(self, request):
         if request.user.shopping_cart.exists():
-            ingredients = RecipeIngredient.objects.filter(
-                recipe__shopping_cart__user=request.user
-            ).values("ingredient__name", "ingredient__measurement_unit"
-                     ).annotate(sum=Sum("amount"))
-
-            ingredients_list = "\n".join(
-                f"{ingredient['ingredient__name']} - {ingredient['sum']} "
-                f"({ingredient['ingredient__measurement_unit']})"
-                for ingredient in ingredients
+            renderer = request.accepted_renderer
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type += f'; charset={renderer.charset}'
+            file_format = renderer.format
+            response = StreamingHttpResponse(
+                STREAMS[file_format](shopping_list_rows(request.user)),
+                content_type=content_type,
             )
-            filename = 'shopping_list.txt'
-            response = HttpResponse(ingredients_list,
-                                    content_type='text/plain')
+            filename = f'{SHOPPING_LIST_FILENAME}.{file_format}'
             response['Content-Disposition'] = (f'attachment; '
                                                f'filename={filename}')
             return response
@@ -119,6 +158,44 @@ class RecipeViewSet(viewsets.ModelViewSet):
             status=status.HTTP_404_NOT_FOUND,
         )
 
+    @action(['get'],
+            detail=False,
+            url_path='export',
+            permission_classes=[IsAuthenticated],
+            renderer_classes=[NDJSONRenderer])
+    def export_recipes(self, request):
+        response = StreamingHttpResponse(
+            export_recipes(Recipe.objects.filter(author=request.user)),
+            content_type=NDJSONRenderer.media_type,
+        )
+        filename = RECIPE_TRANSFER_FILENAME
+        response['Content-Disposition'] = (f'attachment; '
+                                           f'filename={filename}')
+        return response
+
+    @action(['post'],
+            detail=False,
+            url_path='import',
+            permission_classes=[IsAuthenticated],
+            parser_classes=[NDJSONParser])
+    def import_recipes(self, request):
+        # Large catalogs do not fit in a request timeout and are loaded
+        # with the import_recipes management command.
+        size = int(request.META.get('CONTENT_LENGTH') or 0)
+        too_large = size > RECIPE_IMPORT_MAX_SIZE
+        if not too_large:
+            lines = list(islice(request.data, RECIPE_IMPORT_MAX_LINES + 1))
+            too_large = len(lines) > RECIPE_IMPORT_MAX_LINES
+        if too_large:
+            return Response(
+                f'Через API можно загрузить не больше '
+                f'{RECIPE_IMPORT_MAX_LINES} рецептов и '
+                f'{RECIPE_IMPORT_MAX_SIZE // 1024 ** 2} МБ за раз. '
+                'Большие файлы загружаются командой import_recipes.',
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        return Response(RecipeImport(request.user).run(lines))
+
     @action(['get'],
             detail=True,
             url_path='get-link',)
@@ -137,12 +214,14 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = IngredientSerializer
     permission_classes = [IsAuthorOrReadOnly]
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        name = self.request.query_params.get('name')
-        if name:
-            queryset = queryset.filter(name__istartswith=name)
-        return queryset
+    @conditional_get(ingredient_list_state)
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name', '')
+        return Response(get_ingredient_index().search(name))
+
+    @conditional_get(ingredient_detail_state)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class ShortLinkNavigate(views.APIView):
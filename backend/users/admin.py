@@ -6,7 +6,7 @@ from .models import User, Sub
 class UserAdmin(admin.ModelAdmin):
     list_display = (
         'id', 'first_name', 'last_name',
-        'username', 'email',
+        'username', 'email', 'recipes_count',
     )
     search_fields = (
         'email',
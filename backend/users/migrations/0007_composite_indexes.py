@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='sub',
+            options={'verbose_name': 'Подписка', 'verbose_name_plural': 'Подписки'},
+        ),
+        migrations.AddIndex(
+            model_name='sub',
+            index=models.Index(fields=['sub_to', 'sub_from'], name='sub_to_from_idx'),
+        ),
+        migrations.AlterField(
+            model_name='sub',
+            name='sub_from',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='sub_from', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь, который подписался'),
+        ),
+        migrations.AlterField(
+            model_name='sub',
+            name='sub_to',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='sub_to', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь, на кого подписались'),
+        ),
+    ]
@@ -1,19 +1,36 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models import Exists, OuterRef, Value
 from django.core.validators import RegexValidator
 
 from utils.constants import (EMAIL_LEN, USER_NAMES_LEN,
                              AVATAR_UPLOAD_PATH, USERNAME_VALIDATOR_REGEX,
                              USERNAME_VALIDATOR_MESSAGE,)
+from utils.models import CounterFieldsMixin
 
 
-class User(AbstractUser):
+class UserQuerySet(models.QuerySet):
+    def with_is_subscribed(self, user):
+        if user.is_anonymous:
+            return self.annotate(is_subscribed=Value(False))
+        return self.annotate(
+            is_subscribed=Exists(Sub.objects.filter(
+                sub_from=user, sub_to=OuterRef('pk'))),
+        )
+
+
+class FoodgramUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
+
+
+class User(CounterFieldsMixin, AbstractUser):
     REQUIRED_FIELDS = [
         'username',
         'first_name',
         'last_name',
     ]
     USERNAME_FIELD = 'email'
+    counter_fields = ('recipes_count',)
     username_regex = RegexValidator(
         regex=USERNAME_VALIDATOR_REGEX,
         message=USERNAME_VALIDATOR_MESSAGE
@@ -37,6 +54,17 @@ class User(AbstractUser):
         null=True,
         default=None,
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения профиля',
+        auto_now=True,
+    )
+    recipes_count = models.PositiveIntegerField(
+        'Кол-во рецептов',
+        default=0,
+        editable=False,
+    )
+
+    objects = FoodgramUserManager()
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -53,18 +81,19 @@ class Sub(models.Model):
         on_delete=models.CASCADE,
         related_name="sub_to",
         verbose_name="Пользователь, на кого подписались",
+        db_index=False,
     )
     sub_from = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name="sub_from",
         verbose_name="Пользователь, который подписался",
+        db_index=False,
     )
 
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
-        ordering = ('sub_to',)
         constraints = [
             models.UniqueConstraint(
                 fields=['sub_from', 'sub_to'],
@@ -75,6 +104,12 @@ class Sub(models.Model):
                 name='prevent_self_subscription'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['sub_to', 'sub_from'],
+                name='sub_to_from_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Пользователь {self.sub_from} подписан на {self.sub_to}'
@@ -1,10 +1,14 @@
 from rest_framework import serializers
-from drf_extra_fields.fields import Base64ImageField
 
 from users.models import User, Sub
+from utils.fields import DeferredBase64ImageField
+from utils.images import derivative_urls
+from utils.profiling import ProfiledListSerializer, ProfiledSerializerMixin
+from utils.serializers import ReadOnlySerializer
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(ProfiledSerializerMixin,
+                                 serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
@@ -17,24 +21,47 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return User.objects.create_user(**validated_data)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ProfiledSerializerMixin,
+                     serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = (
             'email', 'id', 'username', 'first_name',
-            'last_name', 'is_subscribed', 'avatar',
+            'last_name', 'is_subscribed', 'avatar', 'avatar_variants',
         )
+        list_serializer_class = ProfiledListSerializer
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context.get('request').user
         return not user.is_anonymous and \
             Sub.objects.filter(sub_from=user, sub_to=obj).exists()
 
+    def get_avatar_variants(self, obj):
+        return derivative_urls(obj.avatar, self.context.get('request'))
 
-class AvatarSerializer(serializers.ModelSerializer):
-    avatar = Base64ImageField()
+
+class UserReadSerializer(ReadOnlySerializer):
+    def to_representation(self, instance):
+        return {
+            'email': instance.email,
+            'id': instance.id,
+            'username': instance.username,
+            'first_name': instance.first_name,
+            'last_name': instance.last_name,
+            'is_subscribed': instance.is_subscribed,
+            'avatar': self.image_url(instance.avatar),
+            'avatar_variants': self.image_variants(instance.avatar),
+        }
+
+
+class AvatarSerializer(ProfiledSerializerMixin,
+                       serializers.ModelSerializer):
+    avatar = DeferredBase64ImageField()
 
     class Meta:
         model = User
@@ -44,7 +71,7 @@ class AvatarSerializer(serializers.ModelSerializer):
 class SubSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField(
         method_name="get_users_recipes")
-    recipes_count = serializers.ReadOnlyField(source="recipes.count")
+    recipes_count = serializers.ReadOnlyField()
 
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + ('recipes', 'recipes_count')
@@ -53,25 +80,13 @@ class SubSerializer(UserSerializer):
         from recipes.serializers import RecipeForCartSerializer
 
         request = self.context.get("request")
-        recipes = obj.recipes.all()
-        recipes_limit = request.query_params.get("recipes_limit")
-
-        if recipes_limit and recipes_limit.isdigit():
-            recipes = recipes[:int(recipes_limit)]
+        if hasattr(obj, 'recent_recipes'):
+            recipes = obj.recent_recipes
+        else:
+            recipes = obj.recipes.all()
+            recipes_limit = request.query_params.get("recipes_limit")
+            if recipes_limit and recipes_limit.isdigit():
+                recipes = recipes[:int(recipes_limit)]
 
         return RecipeForCartSerializer(recipes, context={"request": request},
                                        many=True).data
-
-
-class CreateSubSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Sub
-        fields = ("sub_to", "sub_from")
-        extra_kwargs = {
-            "sub_to": {"write_only": True},
-            "sub_from": {"write_only": True},
-        }
-
-    def to_representation(self, instance):
-        user = instance.sub_to
-        return SubSerializer(user, context=self.context).data
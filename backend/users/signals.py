@@ -0,0 +1,37 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from recipes.response_cache import invalidate_recipe_responses
+from utils.authentication import (invalidate_cached_token,
+                                  invalidate_cached_user, )
+from utils.images import process_uploaded_image
+from utils.tasks import submit
+from .models import User
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_cached_token, instance.key))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_cached_user, instance.pk))
+
+
+def process_avatar(user_id):
+    if process_uploaded_image(User, user_id, 'avatar'):
+        invalidate_cached_user(user_id)
+        invalidate_recipe_responses()
+
+
+@receiver(post_save, sender=User)
+def avatar_saved(sender, instance, update_fields=None, **kwargs):
+    if instance.avatar and (update_fields is None
+                            or 'avatar' in update_fields):
+        transaction.on_commit(partial(submit, process_avatar, instance.pk))
@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -5,21 +6,36 @@ from rest_framework.response import Response
 from djoser.serializers import SetPasswordSerializer
 
 from .serializers import UserSerializer, UserRegistrationSerializer
+from .serializers import UserReadSerializer
 from .serializers import AvatarSerializer
-from .serializers import CreateSubSerializer, SubSerializer
+from .serializers import SubSerializer
 from users.models import User, Sub
-from utils.pagination import FoodgramPagination
+from recipes.models import Recipe
+from recipes.serializers import RecipeReadSerializer
+from utils.bulk import bulk_add, bulk_remove
+from utils.images import delete_derivatives
+from utils.links import add_link, remove_link
+from utils.pagination import (FoodgramCursorPagination, FoodgramPagination,
+                              OptionalCursorPaginationMixin, )
+from utils.serializers import BulkIdsSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
     pagination_class = FoodgramPagination
+    cursor_ordering = ('username',)
+    lookup_value_regex = r'\d+'
+
+    def get_queryset(self):
+        return super().get_queryset().with_is_subscribed(self.request.user)
 
     def get_serializer_class(self):
         if self.action == 'create':
             return UserRegistrationSerializer
+        if self.action in ('list', 'retrieve'):
+            return UserReadSerializer
         return UserSerializer
 
     @action(detail=False,
@@ -70,6 +86,7 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
 
             if user.avatar:
+                delete_derivatives(user.avatar)
                 user.avatar.delete()
 
             serializer.save()
@@ -84,6 +101,7 @@ class UserViewSet(viewsets.ModelViewSet):
                     }, status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            delete_derivatives(user.avatar)
             user.avatar.delete()
             user.save()
             return Response(
@@ -99,72 +117,91 @@ class UserViewSet(viewsets.ModelViewSet):
             permission_classes=[IsAuthenticated])
     def subscribe(self, request, pk):
         if request.method == "POST":
-            sub_to = User.objects.filter(pk=pk)
-            if not sub_to.exists():
+            sub_to = User.objects.filter(pk=pk).first()
+            if sub_to is None:
                 return Response(
                     "Нельзя подписаться на несуществующего пользователя!",
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
-            if (int(pk) == request.user.id):
+            if sub_to == request.user:
                 return Response(
                     "Нельзя подписаться на самого себя!",
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            sub = Sub.objects.filter(
-                sub_from=request.user.id, sub_to=pk
-            )
-            if sub.exists():
+            if not add_link(Sub, 'sub_to', sub_to.id,
+                            sub_from=request.user):
                 return Response(
                     "Вы уже подписаны на этого пользователя!",
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            serializer = CreateSubSerializer(
-                data={
-                    "sub_from": request.user.id,
-                    "sub_to": pk,
-                },
-                context={"request": request},
-            )
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-
+            sub_to.is_subscribed = True
+            serializer = SubSerializer(sub_to, context={"request": request})
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         if request.method == "DELETE":
-            sub_to = User.objects.filter(pk=pk)
-            if not sub_to.exists():
-                return Response(
-                    "Нельзя отписаться от несуществующего пользователя!",
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-
-            sub = Sub.objects.filter(
-                sub_from=request.user.id, sub_to=pk
-            )
-
-            if not sub.exists():
+            if not remove_link(Sub, 'sub_to', int(pk),
+                               sub_from=request.user):
+                if not User.objects.filter(pk=pk).exists():
+                    return Response(
+                        "Нельзя отписаться от несуществующего пользователя!",
+                        status=status.HTTP_404_NOT_FOUND,
+                    )
                 return Response(
                     "Нельзя удалить несуществующую подписку!",
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            sub.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
 
-            return Response(
-                f"Вы отписались от пользователя {User.objects.get(pk=pk)}",
-                status=status.HTTP_204_NO_CONTENT
-            )
+    @action(['post', 'delete'],
+            detail=False,
+            url_path='subscribe/bulk',
+            permission_classes=[IsAuthenticated])
+    def subscribe_bulk(self, request):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        if request.method == 'POST':
+            results, _ = bulk_add(
+                Sub, 'sub_to', User.objects.exclude(pk=request.user.pk),
+                ids, sub_from=request.user)
+        else:
+            results, _ = bulk_remove(
+                Sub, 'sub_to', ids, sub_from=request.user)
+        return Response(results)
 
     @action(['get'],
             detail=False,
             permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
+        recipes = Recipe.objects.only(
+            'id', 'author', 'name', 'image', 'cooking_time')
+        recipes_limit = request.query_params.get('recipes_limit')
+        if recipes_limit and recipes_limit.isdigit():
+            recipes = recipes.latest_per_author(int(recipes_limit))
         subscribed_users = User.objects.filter(
-            sub_to__sub_from=request.user).order_by('username')
+            sub_to__sub_from=request.user
+        ).with_is_subscribed(request.user).prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='recent_recipes')
+        ).order_by('username')
         pages = self.paginate_queryset(subscribed_users)
         serializer = SubSerializer(
             pages, many=True, context={'request': request})
         return self.get_paginated_response(serializer.data)
+
+    @action(['get'],
+            detail=False,
+            permission_classes=[IsAuthenticated])
+    def feed(self, request):
+        recipes = Recipe.objects.filter(
+            author__in=Sub.objects.filter(
+                sub_from=request.user).values('sub_to')
+        ).for_listing(request.user)
+        paginator = FoodgramCursorPagination()
+        page = paginator.paginate_queryset(recipes, request, view=self)
+        serializer = RecipeReadSerializer(
+            page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .constants import (AUTH_TOKEN_CACHE_KEY, AUTH_TOKEN_CACHE_TIMEOUT,
+                        AUTH_USER_TOKEN_CACHE_KEY, )
+
+
+def token_cache_key(key):
+    return f'{AUTH_TOKEN_CACHE_KEY}:{key}'
+
+
+def user_token_cache_key(user_id):
+    return f'{AUTH_USER_TOKEN_CACHE_KEY}:{user_id}'
+
+
+def invalidate_cached_token(key):
+    cache.delete(token_cache_key(key))
+
+
+def invalidate_cached_user(user_id):
+    key = cache.get(user_token_cache_key(user_id))
+    if key is not None:
+        cache.delete_many([token_cache_key(key),
+                           user_token_cache_key(user_id)])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        token = cache.get(token_cache_key(key))
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set_many({
+                token_cache_key(key): token,
+                user_token_cache_key(user.pk): key,
+            }, AUTH_TOKEN_CACHE_TIMEOUT)
+            return user, token
+
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
@@ -0,0 +1,26 @@
+from .constants import (BULK_CREATED, BULK_DELETED, BULK_EXISTS,
+                        BULK_MISSING, BULK_NOT_FOUND, )
+from .links import add_links, remove_links
+
+
+def bulk_add(model, target_field, targets, ids, **owner):
+    found = set(targets.filter(pk__in=ids).values_list('pk', flat=True))
+    created = add_links(model, target_field, list(found), **owner)
+    results = [
+        {
+            'id': pk,
+            'status': (BULK_NOT_FOUND if pk not in found
+                       else BULK_CREATED if pk in created else BULK_EXISTS),
+        }
+        for pk in ids
+    ]
+    return results, created
+
+
+def bulk_remove(model, target_field, ids, **owner):
+    deleted = remove_links(model, target_field, ids, **owner)
+    results = [
+        {'id': pk, 'status': BULK_DELETED if pk in deleted else BULK_MISSING}
+        for pk in ids
+    ]
+    return results, deleted
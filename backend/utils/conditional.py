@@ -0,0 +1,30 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    return hashlib.md5(
+        repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def conditional_get(state_func):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag, last_modified = state_func(self, request, *args, **kwargs)
+            etag = etag and quote_etag(etag)
+            last_modified = last_modified and int(last_modified.timestamp())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if etag:
+                response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+            return response
+        return wrapper
+    return decorator
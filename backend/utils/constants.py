@@ -14,3 +14,60 @@ AVATAR_UPLOAD_PATH = 'avatars/'
 USERNAME_VALIDATOR_REGEX = r'^[\w.@+-]+\Z'
 USERNAME_VALIDATOR_MESSAGE = 'Уникальный юзернейм может содержать только '
 'буквы, цифры и @/./+/-/_'
+SHOPPING_LIST_FILENAME = 'shopping_list'
+SHOPPING_LIST_CHUNK_SIZE = 500
+SHOPPING_LIST_PDF_FONT_SIZE = 12
+SHOPPING_LIST_PDF_MARGIN = 50
+CACHE_VERSION_NAME_LEN = 64
+INGREDIENT_INDEX_CACHE_KEY = 'ingredient-index'
+INGREDIENT_INDEX_VERSION_KEY = 'ingredient-index-version'
+INGREDIENT_INDEX_CHECK_INTERVAL = 5
+RECIPE_SEARCH_CONFIG = 'russian'
+CURSOR_PAGINATION_MODE = 'cursor'
+AUTH_TOKEN_CACHE_KEY = 'auth-token'
+AUTH_USER_TOKEN_CACHE_KEY = 'auth-user-token'
+AUTH_TOKEN_CACHE_TIMEOUT = 300
+IMAGE_DERIVATIVES_DIR = 'derivatives'
+IMAGE_DERIVATIVE_SIZES = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'full': (1280, 1280),
+}
+IMAGE_DERIVATIVE_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+IMAGE_DERIVATIVE_QUALITY = 80
+IMAGE_MAX_SIZE = (2560, 2560)
+BULK_MAX_ITEMS = 100
+BULK_CREATED = 'created'
+BULK_EXISTS = 'exists'
+BULK_DELETED = 'deleted'
+BULK_MISSING = 'missing'
+BULK_NOT_FOUND = 'not_found'
+RECIPE_RESPONSE_CACHE_KEY = 'recipe-response'
+RECIPE_RESPONSE_VERSION_KEY = 'recipe-response-version'
+RECIPE_RESPONSE_CACHE_TIMEOUT = 600
+PROFILING_METRIC_PREFIX = 'foodgram'
+PROFILING_SQL_PREVIEW_LEN = 200
+PROFILING_DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+RECIPE_TRANSFER_BATCH_SIZE = 1000
+RECIPE_TRANSFER_MAX_ERRORS = 100
+RECIPE_TRANSFER_FILENAME = 'recipes.ndjson'
+RECIPE_IMPORT_MAX_LINES = 1000
+RECIPE_IMPORT_MAX_SIZE = 5 * 1024 * 1024
+POSITIVE_SMALL_INT_MAX = 32767
+# measurement_unit -> (unit the shopping list sums in, multiplier)
+UNIT_CONVERSIONS = {
+    'кг': ('г', 1000),
+    'кг.': ('г', 1000),
+    'г.': ('г', 1),
+    'гр': ('г', 1),
+    'гр.': ('г', 1),
+    'л': ('мл', 1000),
+    'л.': ('мл', 1000),
+    'мл.': ('мл', 1),
+    'шт': ('шт.', 1),
+}
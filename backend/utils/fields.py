@@ -0,0 +1,12 @@
+import filetype
+from drf_extra_fields.fields import Base64FileField, Base64ImageField
+
+
+class DeferredBase64ImageField(Base64FileField):
+    ALLOWED_TYPES = Base64ImageField.ALLOWED_TYPES
+    INVALID_FILE_MESSAGE = Base64ImageField.INVALID_FILE_MESSAGE
+    INVALID_TYPE_MESSAGE = Base64ImageField.INVALID_TYPE_MESSAGE
+
+    def get_file_extension(self, filename, decoded_file):
+        extension = filetype.guess_extension(decoded_file)
+        return 'jpg' if extension == 'jpeg' else extension
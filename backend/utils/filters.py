@@ -1,6 +1,10 @@
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramSimilarity, )
+from django.db.models import F, Q
 from django_filters.rest_framework import (FilterSet, filters,)
 
 from recipes.models import Recipe
+from .constants import RECIPE_SEARCH_CONFIG
 
 
 class RecipeFilterSet(FilterSet):
@@ -10,6 +14,9 @@ class RecipeFilterSet(FilterSet):
     is_favorited = filters.BooleanFilter(
         method='filter_is_favorited'
     )
+    search = filters.CharFilter(
+        method='filter_search',
+    )
 
     class Meta:
         model = Recipe
@@ -17,6 +24,7 @@ class RecipeFilterSet(FilterSet):
             'author',
             'is_in_shopping_cart',
             'is_favorited',
+            'search',
         )
 
     def filter_is_favorited(self, queryset, name, value):
@@ -28,3 +36,16 @@ class RecipeFilterSet(FilterSet):
         if not value:
             return queryset
         return queryset.filter(shopping_cart__user_id=self.request.user.id)
+
+    def filter_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        query = SearchQuery(value, config=RECIPE_SEARCH_CONFIG,
+                            search_type='websearch')
+        return queryset.filter(
+            Q(search_vector=query) | Q(name__icontains=value)
+        ).annotate(
+            rank=(SearchRank(F('search_vector'), query)
+                  + TrigramSimilarity('name', value))
+        ).order_by('-rank', '-pub_date')
@@ -0,0 +1,134 @@
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .constants import (IMAGE_DERIVATIVE_FORMATS, IMAGE_DERIVATIVE_QUALITY,
+                        IMAGE_DERIVATIVE_SIZES, IMAGE_DERIVATIVES_DIR,
+                        IMAGE_MAX_SIZE, )
+
+logger = logging.getLogger(__name__)
+
+
+def derivative_stem(name):
+    return f'{IMAGE_DERIVATIVES_DIR}/{posixpath.splitext(name)[0]}'
+
+
+def derivative_name(name, size, extension):
+    return f'{derivative_stem(name)}_{size}.{extension}'
+
+
+def derivative_names(name):
+    return [
+        derivative_name(name, size, extension)
+        for size in IMAGE_DERIVATIVE_SIZES
+        for extension in IMAGE_DERIVATIVE_FORMATS
+    ]
+
+
+def has_derivatives(field_file):
+    return all(field_file.storage.exists(name)
+               for name in derivative_names(field_file.name))
+
+
+def encode_image(image, image_format):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, quality=IMAGE_DERIVATIVE_QUALITY,
+               optimize=True)
+    return buffer.getvalue()
+
+
+def open_image(field_file):
+    with field_file.open('rb') as file:
+        image = Image.open(file)
+        image_format = image.format
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    return image, image_format
+
+
+def generate_derivatives(field_file, source=None):
+    storage = field_file.storage
+    if source is None:
+        source, _ = open_image(field_file)
+
+    for size, dimensions in IMAGE_DERIVATIVE_SIZES.items():
+        image = source.copy()
+        image.thumbnail(dimensions, Image.Resampling.LANCZOS)
+        for extension, image_format in IMAGE_DERIVATIVE_FORMATS.items():
+            name = derivative_name(field_file.name, size, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(encode_image(image, image_format)))
+
+
+def delete_derivatives(field_file):
+    for name in derivative_names(field_file.name):
+        field_file.storage.delete(name)
+
+
+def derivative_urls(field_file, request=None):
+    if not field_file:
+        return None
+    urls = {}
+    for size in IMAGE_DERIVATIVE_SIZES:
+        urls[size] = {}
+        for extension in IMAGE_DERIVATIVE_FORMATS:
+            url = field_file.storage.url(
+                derivative_name(field_file.name, size, extension))
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[size][extension] = url
+    return urls
+
+
+def copy_image(storage, name, max_length=None):
+    with storage.open(name, 'rb') as file:
+        return storage.save(name, file, max_length=max_length)
+
+
+def normalize_image(field_file):
+    image, image_format = open_image(field_file)
+    image.thumbnail(IMAGE_MAX_SIZE, Image.Resampling.LANCZOS)
+    if image_format not in ('JPEG', 'PNG', 'WEBP'):
+        image_format = 'PNG'
+    content = ContentFile(encode_image(image, image_format))
+    name = field_file.storage.save(
+        field_file.name, content, max_length=field_file.field.max_length)
+    return name, image
+
+
+def process_uploaded_image(model, pk, field_name):
+    instance = model.objects.filter(pk=pk).only(field_name).first()
+    field_file = getattr(instance, field_name, None)
+    if not field_file or has_derivatives(field_file):
+        return
+
+    try:
+        name, image = normalize_image(field_file)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        # Uploads are only checked by their header before saving, so an
+        # image that cannot be decoded is removed instead of served.
+        logger.warning('Картинка %s повреждена и удалена', field_file.name)
+        name, image = '', None
+
+    updated = model.objects.filter(
+        pk=pk, **{field_name: field_file.name}
+    ).update(**{field_name: name}, updated_at=timezone.now())
+    if not updated:
+        if name:
+            field_file.storage.delete(name)
+        return
+    field_file.storage.delete(field_file.name)
+    if image is None:
+        return True
+    field_file.name = name
+    generate_derivatives(field_file, image)
+    return True
@@ -0,0 +1,68 @@
+from django.db import connections, router, transaction
+from django.dispatch import Signal
+
+links_changed = Signal()
+
+
+def link_owner(owner):
+    return {
+        name: getattr(value, 'pk', value) for name, value in owner.items()
+    }
+
+
+def change_links(model, sql, params, target_field, ids, delta, owner):
+    if not ids:
+        return set()
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    columns = [quote(model._meta.get_field(name).column) for name in owner]
+    target = quote(model._meta.get_field(target_field).column)
+    row = f'({", ".join(["%s"] * (len(columns) + 1))})'
+    sql = sql.format(
+        table=quote(model._meta.db_table),
+        columns=', '.join([*columns, target]),
+        rows=', '.join([row] * len(ids)),
+        conditions=' AND '.join(f'{column} = %s' for column in columns),
+        target=target,
+        ids=', '.join(['%s'] * len(ids)),
+    )
+    # The link rows and the state derived from them by links_changed
+    # receivers are written together.
+    with transaction.atomic(using=connection.alias, savepoint=False):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            changed = {row[0] for row in cursor.fetchall()}
+        if changed:
+            links_changed.send(
+                model, owner=owner, ids=changed, delta=delta)
+    return changed
+
+
+def add_links(model, target_field, ids, **owner):
+    owner = link_owner(owner)
+    return change_links(
+        model,
+        'INSERT INTO {table} ({columns}) VALUES {rows} '
+        'ON CONFLICT DO NOTHING RETURNING {target}',
+        [param for pk in ids for param in (*owner.values(), pk)],
+        target_field, ids, 1, owner,
+    )
+
+
+def remove_links(model, target_field, ids, **owner):
+    owner = link_owner(owner)
+    return change_links(
+        model,
+        'DELETE FROM {table} WHERE {conditions} AND {target} IN ({ids}) '
+        'RETURNING {target}',
+        [*owner.values(), *ids],
+        target_field, ids, -1, owner,
+    )
+
+
+def add_link(model, target_field, pk, **owner):
+    return bool(add_links(model, target_field, [pk], **owner))
+
+
+def remove_link(model, target_field, pk, **owner):
+    return bool(remove_links(model, target_field, [pk], **owner))
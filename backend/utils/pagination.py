@@ -1,8 +1,37 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
-from .constants import DEFAULT_PAGE_SIZE
+from .constants import CURSOR_PAGINATION_MODE, DEFAULT_PAGE_SIZE
 
 
 class FoodgramPagination(PageNumberPagination):
     page_size_query_param = 'limit'
     page_size = DEFAULT_PAGE_SIZE
+
+
+class FoodgramCursorPagination(CursorPagination):
+    page_size_query_param = 'limit'
+    page_size = DEFAULT_PAGE_SIZE
+    ordering = ('-pub_date', '-id')
+
+
+class OptionalCursorPaginationMixin:
+    cursor_pagination_class = FoodgramCursorPagination
+    cursor_ordering = None
+
+    def use_cursor_pagination(self):
+        query_params = self.request.query_params
+        return (
+            self.cursor_pagination_class.cursor_query_param in query_params
+            or query_params.get('pagination') == CURSOR_PAGINATION_MODE
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.use_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+                if self.cursor_ordering:
+                    self._paginator.ordering = self.cursor_ordering
+            else:
+                self._paginator = super().paginator
+        return self._paginator
@@ -0,0 +1,245 @@
+import cProfile
+import hmac
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from threading import Lock
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+
+from .constants import (PROFILING_DURATION_BUCKETS, PROFILING_METRIC_PREFIX,
+                        PROFILING_SQL_PREVIEW_LEN, )
+
+logger = logging.getLogger(__name__)
+current_profile = ContextVar('current_profile', default=None)
+STREAM_END = object()
+
+
+class RequestProfile:
+    def __init__(self, sampled=False):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = Counter()
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.profiler = cProfile.Profile() if sampled else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries[sql] += 1
+
+    @contextmanager
+    def active(self):
+        token = current_profile.set(self)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            if self.profiler:
+                self.profiler.enable()
+            try:
+                yield self
+            finally:
+                if self.profiler:
+                    self.profiler.disable()
+                self.duration += time.perf_counter() - started
+                current_profile.reset(token)
+
+    def stream(self, content, finish):
+        iterator = iter(content)
+        try:
+            while True:
+                with self.active():
+                    chunk = next(iterator, STREAM_END)
+                if chunk is STREAM_END:
+                    break
+                yield chunk
+        finally:
+            finish()
+
+    def summary(self):
+        repeated = {sql: count for sql, count in self.queries.items()
+                    if count > 1}
+        top = max(repeated, key=repeated.get, default=None)
+        return {
+            'duration': round(self.duration, 6),
+            'sql_count': sum(self.queries.values()),
+            'sql_time': round(self.sql_time, 6),
+            'sql_repeated': sum(count - 1 for count in repeated.values()),
+            'sql_top_repeated': top and top[:PROFILING_SQL_PREVIEW_LEN],
+            'serializer_time': round(self.serializer_time, 6),
+        }
+
+
+class Metrics:
+    counters = (
+        ('requests_total', 'Количество запросов.', None),
+        ('sql_queries_total', 'Количество SQL-запросов.', 'sql_count'),
+        ('sql_repeated_queries_total',
+         'Количество повторных SQL-запросов.', 'sql_repeated'),
+        ('sql_duration_seconds_total',
+         'Время выполнения SQL-запросов.', 'sql_time'),
+        ('serializer_duration_seconds_total',
+         'Время работы сериализаторов.', 'serializer_time'),
+    )
+
+    def __init__(self):
+        self.lock = Lock()
+        self.values = defaultdict(Counter)
+        self.buckets = defaultdict(
+            lambda: [0] * len(PROFILING_DURATION_BUCKETS))
+
+    def observe(self, record):
+        labels = (record['view'], record['method'])
+        with self.lock:
+            values = self.values[labels]
+            for name, _, field in self.counters:
+                values[name] += record[field] if field else 1
+            values['duration'] += record['duration']
+            for index, bound in enumerate(PROFILING_DURATION_BUCKETS):
+                if record['duration'] <= bound:
+                    self.buckets[labels][index] += 1
+
+    def render(self):
+        prefix = PROFILING_METRIC_PREFIX
+        lines = []
+        with self.lock:
+            items = sorted(
+                (labels, dict(values), list(self.buckets[labels]))
+                for labels, values in self.values.items()
+            )
+        for name, description, _ in self.counters:
+            lines.append(f'# HELP {prefix}_{name} {description}')
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            for labels, values, _ in items:
+                lines.append(
+                    f'{prefix}_{name}{{{format_labels(*labels)}}} '
+                    f'{values[name]}'
+                )
+        name = f'{prefix}_request_duration_seconds'
+        lines.append(f'# HELP {name} Время обработки запроса.')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, values, buckets in items:
+            label_text = format_labels(*labels)
+            for bound, count in zip(PROFILING_DURATION_BUCKETS, buckets):
+                lines.append(
+                    f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(
+                f'{name}_bucket{{{label_text},le="+Inf"}} '
+                f'{values["requests_total"]}'
+            )
+            lines.append(f'{name}_sum{{{label_text}}} {values["duration"]}')
+            lines.append(
+                f'{name}_count{{{label_text}}} {values["requests_total"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(view, method):
+    view = view.replace('\\', '\\\\').replace('"', '\\"')
+    return f'view="{view}",method="{method}"'
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def serializer_timer():
+    profile = current_profile.get()
+    if profile is None or profile.serializer_depth:
+        yield
+        return
+    profile.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_time += time.perf_counter() - started
+        profile.serializer_depth -= 1
+
+
+class ProfiledListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
+
+class ProfiledSerializerMixin:
+    # Serializers used with many=True also set
+    # Meta.list_serializer_class = ProfiledListSerializer.
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile(
+            sampled=random.random() < settings.PROFILING_SAMPLE_RATE)
+        with profile.active():
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = profile.stream(
+                response.streaming_content,
+                lambda: self.finish(profile, request, response),
+            )
+        else:
+            self.finish(profile, request, response)
+        return response
+
+    def finish(self, profile, request, response):
+        match = request.resolver_match
+        record = {
+            'view': match.view_name if match else 'unresolved',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **profile.summary(),
+        }
+        if profile.profiler:
+            record['profile'] = str(self.dump(profile.profiler, record))
+        metrics.observe(record)
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+    def dump(self, profiler, record):
+        directory = Path(settings.PROFILING_DUMP_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        view = record['view'].replace(':', '-')
+        path = directory / f'{view}-{time.time_ns()}.prof'
+        profiler.dump_stats(path)
+        return path
+
+
+def metrics_view(request):
+    token = settings.PROFILING_METRICS_TOKEN
+    if not token:
+        raise Http404
+    scheme, _, credentials = request.headers.get(
+        'Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(
+            credentials.encode(), token.encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
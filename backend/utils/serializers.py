@@ -0,0 +1,54 @@
+from functools import cached_property
+
+from rest_framework import serializers
+
+from .constants import (BULK_MAX_ITEMS, IMAGE_DERIVATIVE_FORMATS,
+                        IMAGE_DERIVATIVE_SIZES, )
+from .images import derivative_stem
+from .profiling import ProfiledListSerializer, ProfiledSerializerMixin
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_MAX_ITEMS,
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
+class ReadOnlySerializer(ProfiledSerializerMixin, serializers.BaseSerializer):
+    class Meta:
+        list_serializer_class = ProfiledListSerializer
+
+    @cached_property
+    def origin(self):
+        request = self.context.get('request')
+        if request is None:
+            return ''
+        return request.build_absolute_uri('/')[:-1]
+
+    def absolute_url(self, url):
+        if url.startswith('/') and not url.startswith('//'):
+            return self.origin + url
+        return url
+
+    def image_url(self, field_file):
+        if not field_file:
+            return None
+        return self.absolute_url(field_file.url)
+
+    def image_variants(self, field_file):
+        if not field_file:
+            return None
+        stem = self.absolute_url(
+            field_file.storage.url(derivative_stem(field_file.name)))
+        return {
+            size: {
+                extension: f'{stem}_{size}.{extension}'
+                for extension in IMAGE_DERIVATIVE_FORMATS
+            }
+            for size in IMAGE_DERIVATIVE_SIZES
+        }
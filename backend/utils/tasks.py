@@ -0,0 +1,34 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BACKGROUND_WORKERS,
+    thread_name_prefix='foodgram-background',
+)
+_slots = BoundedSemaphore(settings.BACKGROUND_QUEUE_SIZE)
+
+
+def run_job(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась с ошибкой',
+                         func.__name__)
+    finally:
+        connections.close_all()
+
+
+def submit(func, *args):
+    if not _slots.acquire(blocking=False):
+        logger.warning('Очередь фоновых задач заполнена, %s выполняется '
+                       'синхронно', func.__name__)
+        func(*args)
+        return
+    future = _executor.submit(run_job, func, *args)
+    future.add_done_callback(lambda _: _slots.release())